@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+"""Time dbSNP rsID searches during the database build, sequential versus parallel
+
+A synthetic dbSNP fixture (bgzipped and tabix-indexed VCFs plus rsidx indexes for GRCh37 and
+GRCh38) is written to a temporary directory, and a random sample of its rsIDs is resolved with a
+single rsidx search per assembly, as in previous builds, and then with
+`VariantIndex.search_dbsnp` using per-chromosome batches and an increasing number of worker
+processes. Requires the database build dependencies (see dbbuild/README.md).
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import pysam
+import random
+import rsidx
+import sqlite3
+import sys
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "dbbuild"))
+from lib.variant import VariantIndex  # noqa: E402
+
+
+def write_fixture(dbsnp_path, numchroms, numvariants):
+    """Write a synthetic dbSNP VCF and rsidx index for each assembly
+
+    Each chromosome has `numvariants` variants spaced 100 bp apart, with rsIDs numbered
+    consecutively across chromosomes. Returns the chromosome of each rsID.
+    """
+    chroms = dict()
+    for offset, refr in enumerate(("GRCh37", "GRCh38")):
+        vcf = Path(dbsnp_path) / f"dbSNP_{refr}.vcf"
+        with open(vcf, "w") as fh:
+            print("##fileformat=VCFv4.2", file=fh)
+            print("##dbSNP_BUILD_ID=0", file=fh)
+            for c in range(1, numchroms + 1):
+                print(f"##contig=<ID=chr{c}>", file=fh)
+            print("#CHROM", "POS", "ID", "REF", "ALT", "QUAL", "FILTER", "INFO", sep="\t", file=fh)
+            for c in range(1, numchroms + 1):
+                for n in range(numvariants):
+                    rsid = f"rs{(c - 1) * numvariants + n + 1}"
+                    position = (n + 1) * 100 + offset
+                    print(f"chr{c}", position, rsid, "A", "G", ".", ".", ".", sep="\t", file=fh)
+                    chroms[rsid] = f"chr{c}"
+        vcfgz = pysam.tabix_index(str(vcf), preset="vcf", force=True)
+        with sqlite3.connect(Path(dbsnp_path) / f"dbSNP_{refr}.rsidx") as db:
+            rsidx.index.index(db, vcfgz)
+    return chroms
+
+
+def search_sequential(dbsnp_path, rsids):
+    coords = dict()
+    for refr in ("GRCh37", "GRCh38"):
+        vcf = Path(dbsnp_path) / f"dbSNP_{refr}.vcf.gz"
+        idx = Path(dbsnp_path) / f"dbSNP_{refr}.rsidx"
+        coords[refr] = dict()
+        VariantIndex.rsidx_search(sorted(rsids), vcf, idx, coords[refr])
+    return coords
+
+
+def main(numchroms=22, numvariants=50000, sample=20000, threads=(1, 2, 4, 8), seed=42):
+    with TemporaryDirectory() as tmpdir:
+        start = perf_counter()
+        chroms = write_fixture(tmpdir, numchroms, numvariants)
+        print(f"Fixture: {len(chroms)} variants, written in {perf_counter() - start:.1f} s")
+        rsids = random.Random(seed).sample(sorted(chroms), sample)
+        start = perf_counter()
+        expected = search_sequential(tmpdir, rsids)
+        print(f"{'Sequential':12s} {perf_counter() - start:8.3f} s")
+        for numthreads in threads:
+            start = perf_counter()
+            coords = VariantIndex.search_dbsnp(
+                tmpdir, dict(GRCh37=rsids, GRCh38=rsids), chroms, threads=numthreads
+            )
+            elapsed = perf_counter() - start
+            assert coords == expected
+            print(f"{f'Threads={numthreads}':12s} {elapsed:8.3f} s")
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-c", "--chroms", type=int, default=22, metavar="C", help="chromosomes; by default C=22"
+    )
+    parser.add_argument(
+        "-v",
+        "--variants",
+        type=int,
+        default=50000,
+        metavar="V",
+        help="variants per chromosome; by default V=50000",
+    )
+    parser.add_argument(
+        "-s",
+        "--sample",
+        type=int,
+        default=20000,
+        metavar="S",
+        help="rsIDs to search for in each assembly; by default S=20000",
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        metavar="T",
+        help="numbers of worker processes to time; by default T=1 2 4 8",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(
+        numchroms=args.chroms,
+        numvariants=args.variants,
+        sample=args.sample,
+        threads=args.threads,
+    )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+"""Time construction of the EFM frequency table for a large marker panel
+
+By default the population with frequency estimates for the most markers is selected, and the
+panel consists of (up to) the first N markers with frequencies for that population.
+"""
+
+from argparse import ArgumentParser
+from contextlib import redirect_stderr
+from io import StringIO
+import microhapdb
+from microhapdb.cli.frequency import construct_frequency_table
+from time import perf_counter
+
+
+def main(population=None, num_markers=1000, reps=3):
+    frequencies = microhapdb.frequencies
+    if population is None:
+        population = frequencies.groupby("Population").Marker.nunique().idxmax()
+    markers = sorted(frequencies[frequencies.Population == population].Marker.unique())
+    panel = markers[:num_markers]
+    times = list()
+    for _ in range(reps):
+        start = perf_counter()
+        with redirect_stderr(StringIO()):
+            table = construct_frequency_table(population, panel)
+            table.to_csv(StringIO())
+        times.append(perf_counter() - start)
+    nrows, ncols = table.shape
+    print(f"Population: {population}")
+    print(f"Panel: {len(panel)} markers, {nrows} haplotypes")
+    print(f"Time (s): min={min(times):.3f} median={sorted(times)[len(times) // 2]:.3f}")
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("-p", "--population", metavar="ID", help="population identifier")
+    parser.add_argument(
+        "-n",
+        "--num-markers",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="maximum number of markers in the panel; by default N=1000",
+    )
+    parser.add_argument(
+        "-r", "--reps", type=int, default=3, metavar="R", help="repetitions; by default R=3"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(population=args.population, num_markers=args.num_markers, reps=args.reps)
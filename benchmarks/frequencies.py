@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+"""Report memory usage and filter performance of the frequency table
+
+The table as loaded by MicroHapDB, with categorical Marker, Population, Allele, and Source
+columns, is compared to the same table with these columns stored as Python strings.
+"""
+
+from argparse import ArgumentParser
+import microhapdb
+from timeit import timeit
+
+
+def filters(table):
+    markers = list(table.Marker.unique()[:50])
+    return {
+        "Population == pop": lambda: table[table.Population == "YRI"],
+        "Marker.isin(50)": lambda: table[table.Marker.isin(markers)],
+        "Allele == allele": lambda: table[table.Allele == "A:G:A"],
+        "groupby(Marker).size()": lambda: table.groupby("Marker", observed=True).size(),
+    }
+
+
+def main(reps=10):
+    compact = microhapdb.frequencies
+    strings = compact.astype({col: str for col in ("Marker", "Population", "Allele", "Source")})
+    mem_compact = compact.memory_usage(deep=True).sum() / 1024**2
+    mem_strings = strings.memory_usage(deep=True).sum() / 1024**2
+    print(f"Rows: {len(compact)}")
+    print(f"Memory, strings:      {mem_strings:8.1f} MB")
+    print(f"Memory, categorical:  {mem_compact:8.1f} MB")
+    print(f"Memory saved:         {mem_strings - mem_compact:8.1f} MB")
+    print(f"\n{'Filter':24s} {'strings (ms)':>13s} {'categorical (ms)':>17s}")
+    for (label, func1), func2 in zip(filters(strings).items(), filters(compact).values()):
+        time1 = timeit(func1, number=reps) / reps * 1000
+        time2 = timeit(func2, number=reps) / reps * 1000
+        print(f"{label:24s} {time1:13.2f} {time2:17.2f}")
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-r", "--reps", type=int, default=10, metavar="R", help="repetitions; by default R=10"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(reps=args.reps)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+"""Compare cold-load time and peak memory of CSV and columnar binary tables
+
+Each bundled CSV table is converted to the columnar format in a temporary directory, and each
+table is then loaded in a fresh interpreter from both formats.
+"""
+
+from argparse import ArgumentParser
+from importlib.resources import files
+from microhapdb.tables import columnar_filename, write_columnar
+import pandas as pd
+from pathlib import Path
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+
+
+TABLES = {
+    "marker.csv": None,
+    "marker-aes.csv": {"Ae": 3},
+    "population.csv": None,
+    "frequency.csv.gz": {"Frequency": 5},
+}
+LOADER = """
+import resource
+from time import perf_counter
+import pandas as pd
+from microhapdb.tables import read_columnar
+start = perf_counter()
+table = {func}({path!r})
+elapsed = perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+"""
+
+
+def load(func, path, reps):
+    code = LOADER.format(func=func, path=str(path))
+    results = list()
+    for _ in range(reps):
+        result = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+        elapsed, rss = map(float, result.stdout.decode().split())
+        results.append((elapsed, rss))
+    results.sort()
+    return results[len(results) // 2]
+
+
+def main(reps=3):
+    print(
+        f"{'Table':18s} {'Format':8s} {'Size (kB)':>10s} {'Time (s)':>9s} {'Peak RSS (MB)':>14s}"
+    )
+    with TemporaryDirectory() as tmpdir:
+        for filename, decimals in TABLES.items():
+            csvpath = files("microhapdb") / "data" / filename
+            if not csvpath.is_file():
+                print(f"{filename:18s} missing, skipping")
+                continue
+            binpath = Path(tmpdir) / columnar_filename(filename)
+            write_columnar(pd.read_csv(csvpath), binpath, decimals=decimals)
+            for label, func, path in (
+                ("csv", "pd.read_csv", csvpath),
+                ("npz", "read_columnar", binpath),
+            ):
+                elapsed, rss = load(func, path, reps)
+                size = Path(path).stat().st_size / 1024
+                print(f"{filename:18s} {label:8s} {size:10.1f} {elapsed:9.3f} {rss:14.1f}")
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-r",
+        "--reps",
+        type=int,
+        default=3,
+        metavar="R",
+        help="repetitions per table and format; median time is reported; by default R=3",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(reps=args.reps)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+"""Time identifier search with the search index versus full-column substring scans
+
+Each query is run against `microhapdb.searchindex` (type-ahead suggestions, substring search,
+and ranked fuzzy search) and, for comparison, as `str.contains` scans over the marker names,
+rsIDs, population IDs, and population names.
+"""
+
+from argparse import ArgumentParser
+import microhapdb
+from time import perf_counter
+
+
+QUERIES = ["J", "Japan", "mh01", "KK-01", "rs108", "rs10815466", "Chaga", "mh17KL-014"]
+
+
+def scan(text):
+    columns = [
+        microhapdb.markers.Name,
+        microhapdb.variantmap.Variant.dropna(),
+        microhapdb.populations.ID,
+        microhapdb.populations.Name,
+    ]
+    return sum(int(column.str.contains(text, case=False, regex=False).sum()) for column in columns)
+
+
+def median_time(function, text, reps):
+    times = list()
+    for _ in range(reps):
+        start = perf_counter()
+        function(text)
+        times.append(perf_counter() - start)
+    return sorted(times)[len(times) // 2] * 1000
+
+
+def main(reps=25):
+    start = perf_counter()
+    index = microhapdb.searchindex
+    print(f"Index: {len(index)} terms, built in {perf_counter() - start:.3f} s")
+    print(
+        f"{'Query':12s} {'Suggest (ms)':>13s} {'Index (ms)':>11s} {'Fuzzy (ms)':>11s} {'Scan (ms)':>10s}"
+    )
+    for text in QUERIES:
+        suggest = median_time(index.suggest, text, reps)
+        substring = median_time(index.substring, text, reps)
+        fuzzy = median_time(lambda t: index.search(t, fuzzy=True), text, reps)
+        scanned = median_time(scan, text, reps)
+        print(f"{text:12s} {suggest:13.3f} {substring:11.3f} {fuzzy:11.3f} {scanned:10.3f}")
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-r", "--reps", type=int, default=25, metavar="R", help="repetitions; by default R=25"
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(reps=args.reps)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+"""Measure per-request latency of `microhapdb serve` under concurrent load
+
+A server is started in a separate process, and a mix of lookup, marker, population, and frequency
+requests is issued by C concurrent clients. For comparison, the latency of the equivalent
+command-line invocations (each of which starts a fresh interpreter) is also reported.
+"""
+
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+import socket
+import subprocess
+import sys
+from time import perf_counter, sleep
+from urllib.error import URLError
+from urllib.request import urlopen
+
+
+COMMAND = [sys.executable, "-c", "import microhapdb.cli; microhapdb.cli.main()"]
+REQUESTS = [
+    ("lookup?id=rs10815466", ["lookup", "rs10815466"]),
+    (
+        "marker?region=chr18:1-25000000&ae-pop=CEU",
+        ["marker", "--region=chr18:1-25000000", "--ae-pop=CEU"],
+    ),
+    (
+        "marker?id=mh01KK-117&id=mh02KK-138&format=offsets",
+        ["marker", "--format=offsets", "mh01KK-117", "mh02KK-138"],
+    ),
+    ("population?id=Japanese", ["population", "Japanese"]),
+    (
+        "frequency?marker=mh17KK-014&population=SA000001B",
+        ["frequency", "--marker=mh17KK-014", "--population=SA000001B"],
+    ),
+]
+
+
+def main(num_requests=500, concurrency=(1, 4, 16), cli_reps=3):
+    port = free_port()
+    server = subprocess.Popen(
+        [*COMMAND, "serve", f"--port={port}"],
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        wait_for_server(url)
+        print(
+            f"{'Clients':>8s} {'Requests/s':>11s} {'p50 (ms)':>9s} {'p95 (ms)':>9s} {'p99 (ms)':>9s}"
+        )
+        for clients in concurrency:
+            paths = [REQUESTS[i % len(REQUESTS)][0] for i in range(num_requests)]
+            start = perf_counter()
+            with ThreadPoolExecutor(max_workers=clients) as executor:
+                latencies = sorted(
+                    executor.map(lambda path: timed_request(f"{url}/{path}"), paths)
+                )
+            elapsed = perf_counter() - start
+            p50, p95, p99 = [
+                1000 * latencies[int(q * (len(latencies) - 1))] for q in (0.5, 0.95, 0.99)
+            ]
+            print(f"{clients:8d} {num_requests / elapsed:11.1f} {p50:9.1f} {p95:9.1f} {p99:9.1f}")
+    finally:
+        server.terminate()
+        server.wait()
+    latencies = list()
+    for _, arglist in REQUESTS:
+        for _ in range(cli_reps):
+            start = perf_counter()
+            subprocess.run([*COMMAND, *arglist], check=True, stdout=subprocess.DEVNULL)
+            latencies.append(perf_counter() - start)
+    latencies.sort()
+    print(f"CLI invocation latency: p50={1000 * latencies[len(latencies) // 2]:.1f} ms")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(url, timeout=120):
+    start = perf_counter()
+    while perf_counter() - start < timeout:
+        try:
+            urlopen(f"{url}/population?id=JPT").read()
+            return
+        except (ConnectionError, URLError):
+            sleep(0.25)
+    raise TimeoutError(f"server at {url} not ready after {timeout} seconds")
+
+
+def timed_request(url):
+    start = perf_counter()
+    with urlopen(url) as response:
+        response.read()
+    return perf_counter() - start
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-n",
+        "--num-requests",
+        type=int,
+        default=500,
+        metavar="N",
+        help="requests per concurrency level; by default N=500",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[1, 4, 16],
+        metavar="C",
+        help="numbers of concurrent clients; by default C=1 4 16",
+    )
+    parser.add_argument(
+        "-r",
+        "--cli-reps",
+        type=int,
+        default=3,
+        metavar="R",
+        help="repetitions of each command-line invocation; by default R=3",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(num_requests=args.num_requests, concurrency=args.concurrency, cli_reps=args.cli_reps)
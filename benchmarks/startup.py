@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+#
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+"""Measure import time and peak memory of `import microhapdb`
+
+Each scenario runs in a fresh interpreter. The "all tables" scenario touches every table after
+import, which approximates the cost every invocation paid when tables were loaded eagerly.
+"""
+
+from argparse import ArgumentParser
+import subprocess
+import sys
+from time import perf_counter
+
+
+SCENARIOS = {
+    "import only": "import microhapdb",
+    "lookup (markers + populations)": "import microhapdb; microhapdb.retrieve_by_id('rs10815466')",
+    "all tables": "import microhapdb; [getattr(microhapdb, t) for t in microhapdb.tables.loaders]",
+}
+
+
+def run_scenario(code):
+    start = perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True)
+    elapsed = perf_counter() - start
+    return elapsed
+
+
+def peak_rss(code):
+    measure = f"{code}\nimport resource; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+    result = subprocess.run([sys.executable, "-c", measure], check=True, capture_output=True)
+    return int(result.stdout.decode().strip().split()[-1]) / 1024
+
+
+def main(reps=5):
+    print(f"{'Scenario':32s} {'Time (s)':>10s} {'Peak RSS (MB)':>14s}")
+    for label, code in SCENARIOS.items():
+        times = sorted(run_scenario(code) for _ in range(reps))
+        print(f"{label:32s} {times[len(times) // 2]:10.3f} {peak_rss(code):14.1f}")
+
+
+def get_parser():
+    parser = ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "-r",
+        "--reps",
+        type=int,
+        default=5,
+        metavar="R",
+        help="repetitions per scenario; median time is reported; by default R=5",
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = get_parser().parse_args()
+    main(reps=args.reps)
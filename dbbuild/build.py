@@ -13,16 +13,43 @@
 # -------------------------------------------------------------------------------------------------
 
 from argparse import ArgumentParser
-from lib import SourceIndex
+from lib import BuildCache, CoordinateCache, SourceIndex
+from microhapdb.manifest import MANIFEST_FILE, compute_manifest, write_manifest
+from microhapdb.tables import COLUMNAR_TABLES, columnar_filename, write_columnar
+import pandas as pd
 from pathlib import Path
 import sys
 
 
-def main(source_path, dbsnp_path, chain_path, exclusions=["Auton2015"], check_only=False):
+def main(
+    source_path,
+    dbsnp_path,
+    chain_path,
+    exclusions=["Auton2015"],
+    check_only=False,
+    cache_path=None,
+    incremental=False,
+    coord_cache_path=None,
+    threads=1,
+):
     validate_paths(dbsnp_path, chain_path)
     if check_only:
         return
-    index = SourceIndex(source_path, dbsnp_path, chain_path, exclude=exclusions)
+    if cache_path is None and incremental:
+        cache_path = "build-cache"
+    cache = None if cache_path is None else BuildCache(cache_path, dbsnp_path, chain_path)
+    if coord_cache_path is None:
+        coord_cache_path = "rsid-coords.sqlite"
+    index = SourceIndex(
+        source_path,
+        dbsnp_path,
+        chain_path,
+        exclude=exclusions,
+        cache=cache,
+        incremental=incremental,
+        coord_cache=CoordinateCache(coord_cache_path),
+        threads=threads,
+    )
     index.interval_check()
     index.update_marker_names()
     index.markers.to_csv("marker.csv", index=False)
@@ -32,6 +59,8 @@ def main(source_path, dbsnp_path, chain_path, exclusions=["Auton2015"], check_on
     frequencies.to_csv("frequency.csv.gz", index=False, float_format="%.5f", compression="gzip")
     index.populations.to_csv("population.csv", index=False)
     index.merges.to_csv("merged.csv", index=False)
+    write_columnar_tables()
+    write_database_manifest()
     print(index)
 
 
@@ -54,6 +83,24 @@ def validate_paths(dbsnp_path, chain_path):
         raise FileNotFoundError(",".join(missing))
 
 
+def write_columnar_tables():
+    """Write a compact binary copy of each table, read back from CSV to ensure identical values"""
+    for filename, decimals in COLUMNAR_TABLES.items():
+        if not Path(filename).is_file():
+            continue
+        table = pd.read_csv(filename)
+        write_columnar(table, columnar_filename(filename), decimals=decimals, source=filename)
+
+
+def write_database_manifest():
+    """Write summary statistics and checksums of the tables, read back from the CSV files"""
+    markers = pd.read_csv("marker.csv")
+    populations = pd.read_csv("population.csv")
+    frequencies = pd.read_csv("frequency.csv.gz")
+    manifest = compute_manifest(markers, populations, frequencies, directory=".")
+    write_manifest(manifest, MANIFEST_FILE)
+
+
 def cleanup_frequencies(freq):
     freq["NumVars"] = freq.Allele.apply(lambda x: x.count("|") + 1)
     freq.loc[(freq.Marker == "mh01NK-001") & (freq.Source == "Kidd2018"), "Marker"] = "mh01NH-01.v2"
@@ -91,6 +138,35 @@ def get_parser():
     parser.add_argument(
         "--check", action="store_true", help="perform auxiliary data file check only and exit"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="reuse cached rsID coordinates and liftOver results for each source whose marker "
+        "definitions have not changed since the previous build, rather than resolving all markers "
+        "from scratch; all other build steps are repeated",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="PATH",
+        help="directory in which to store rsID coordinates and liftOver results for each source; "
+        "by default, results are stored only for incremental builds, in PATH=build-cache/",
+    )
+    parser.add_argument(
+        "--coord-cache",
+        metavar="DB",
+        help="SQLite database in which to cache rsID coordinates resolved from dbSNP, so that only "
+        "rsIDs not resolved by a previous build with the same dbSNP release are searched for in "
+        "the dbSNP VCFs; by default DB=rsid-coords.sqlite in the working directory",
+    )
+    parser.add_argument(
+        "-t",
+        "--threads",
+        type=int,
+        default=1,
+        metavar="T",
+        help="search dbSNP for GRCh37 and GRCh38 rsID coordinates in T parallel processes, each "
+        "handling one chromosome of one assembly at a time; by default T=1",
+    )
     return parser
 
 
@@ -102,4 +178,8 @@ if __name__ == "__main__":
         args.chain_path,
         exclusions=args.exclude,
         check_only=args.check,
+        cache_path=args.cache,
+        incremental=args.incremental,
+        coord_cache_path=args.coord_cache,
+        threads=args.threads,
     )
@@ -10,6 +10,9 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
+from .cache import BuildCache, CoordinateCache
+from .liftover import LiftOver
+from .merged import MergeIndex
 from .variant import VariantList, VariantIndex
 from .marker import Marker, MarkerFromPositions, MarkerFromIDs
 from .source import DataSource, SourceIndex
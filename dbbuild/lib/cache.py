@@ -0,0 +1,108 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+from contextlib import closing
+from hashlib import sha256
+import json
+from pathlib import Path
+import sqlite3
+
+
+class BuildCache:
+    """Cache of the rsID coordinates and liftOver results for each data source
+
+    Resolving rsIDs against dbSNP and lifting positions over between assemblies are by far the most
+    expensive steps of the build. The results for each source are stored under a key computed from
+    the content of the source's `marker.csv` file and the size and modification time of each dbSNP
+    and liftOver chain file, so that they are reused until either the source's marker definitions
+    or the auxiliary data change.
+    """
+
+    def __init__(self, path, dbsnp_path, chain_path):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        auxfiles = sorted(Path(dbsnp_path).glob("dbSNP_GRCh*")) + sorted(
+            Path(dbsnp_path).glob("refsnp-merged*")
+        )
+        auxfiles += sorted(Path(chain_path).glob("*.over.chain.gz"))
+        self.fingerprint = "\n".join(BuildCache.file_fingerprint(path) for path in auxfiles)
+
+    @staticmethod
+    def file_fingerprint(path):
+        stat = path.stat()
+        return f"{path.name}\t{stat.st_size}\t{stat.st_mtime_ns}"
+
+    def key(self, sourcepath):
+        digest = sha256(self.fingerprint.encode("utf-8"))
+        digest.update((Path(sourcepath) / "marker.csv").read_bytes())
+        return digest.hexdigest()
+
+    def entry_path(self, sourcepath):
+        return self.path / f"{Path(sourcepath).name}.json"
+
+    def load(self, sourcepath):
+        """Retrieve the cached results for a source, or `None` if they are missing or stale"""
+        path = self.entry_path(sourcepath)
+        if not path.is_file():
+            return None
+        with open(path, "r") as fh:
+            entry = json.load(fh)
+        if entry["key"] != self.key(sourcepath):
+            return None
+        return entry["lookups"]
+
+    def save(self, sourcepath, lookups):
+        entry = dict(key=self.key(sourcepath), lookups=lookups)
+        with open(self.entry_path(sourcepath), "w") as fh:
+            json.dump(entry, fh)
+
+
+class CoordinateCache:
+    """Persistent SQLite cache of rsID coordinates resolved from dbSNP
+
+    Entries are keyed by dbSNP build, assembly, and rsID. rsIDs that were searched for but not
+    found in dbSNP are recorded with a null position, so that they are not searched for again.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with closing(sqlite3.connect(self.path)) as db, db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS coords (build TEXT NOT NULL, assembly TEXT NOT NULL, "
+                "rsid TEXT NOT NULL, position INTEGER, PRIMARY KEY (build, assembly, rsid)) "
+                "WITHOUT ROWID"
+            )
+
+    def lookup(self, build, assembly, rsids):
+        """Retrieve cached positions, with `None` for rsIDs known to be absent from dbSNP
+
+        rsIDs with no cache entry are not included in the result.
+        """
+        rsids = sorted(rsids)
+        result = dict()
+        with closing(sqlite3.connect(self.path)) as db:
+            for i in range(0, len(rsids), self.BATCH_SIZE):
+                batch = rsids[i : i + self.BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                query = (
+                    "SELECT rsid, position FROM coords WHERE build = ? AND assembly = ? AND "
+                    f"rsid IN ({placeholders})"
+                )
+                result.update(db.execute(query, [build, assembly, *batch]))
+        return result
+
+    def store(self, build, assembly, coords):
+        entries = [(build, assembly, rsid, position) for rsid, position in coords.items()]
+        with closing(sqlite3.connect(self.path)) as db, db:
+            db.executemany("INSERT OR REPLACE INTO coords VALUES (?, ?, ?, ?)", entries)
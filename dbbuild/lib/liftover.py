@@ -0,0 +1,130 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+from collections import defaultdict
+from functools import lru_cache
+import gzip
+import numpy as np
+from pathlib import Path
+
+
+class LiftOver:
+    """Map genomic positions between assemblies with a UCSC chain file
+
+    Each chain in the file is a series of ungapped alignment blocks between a region of the source
+    assembly (the chain's "target") and a region of the destination assembly (its "query"). The
+    blocks are stored in per-chromosome arrays sorted by source start position, along with the
+    running maximum of their end positions, so that a batch of positions is mapped with a binary
+    search (`np.searchsorted`) followed by a scan back over any earlier blocks that may still cover
+    each position, as when chains overlap in the source assembly. As with UCSC liftOver, positions
+    that do not fall in any block, or that fall in more than one, are reported as unmapped.
+
+    >>> chain = LiftOver.parse([
+    ...     "chain 1000 chr1 1000 + 100 200 chr1 1000 + 300 400 1",
+    ...     "40 10 10",
+    ...     "50",
+    ...     "",
+    ...     "chain 900 chr2 1000 + 0 100 chr2 500 - 0 100 2",
+    ...     "100",
+    ...     "",
+    ...     "chain 800 chr3 1000 + 0 300 chr3 1000 + 500 800 3",
+    ...     "300",
+    ...     "",
+    ...     "chain 700 chr3 1000 + 100 150 chr7 1000 + 0 50 4",
+    ...     "50",
+    ... ])
+    >>> chroms, positions, mapped = chain.map("chr1", [101, 145, 151, 200, 201])
+    >>> positions[mapped].tolist(), mapped.tolist()
+    ([301, 351, 400], [True, False, True, True, False])
+    >>> chain.map("chr2", [1])[1].tolist()
+    [500]
+    >>> chroms, positions, mapped = chain.map("chr3", [1, 120, 201, 301])
+    >>> positions[mapped].tolist(), mapped.tolist()
+    ([501, 701], [True, False, True, False])
+    """
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    @staticmethod
+    @lru_cache(maxsize=4)
+    def load(path):
+        """Parse a (gzip-compressed) chain file, caching the result for the rest of the build"""
+        path = Path(path)
+        opener = gzip.open if path.suffix == ".gz" else open
+        with opener(path, "rt") as fh:
+            return LiftOver.parse(fh)
+
+    @staticmethod
+    def parse(lines):
+        columns = defaultdict(lambda: defaultdict(list))
+        for line in lines:
+            values = line.split()
+            if len(values) == 0:
+                continue
+            if values[0] == "chain":
+                source = values[2]
+                tstart = int(values[5])
+                dest, qsize, qstrand = values[7], int(values[8]), values[9]
+                qstart = int(values[10])
+                continue
+            size = int(values[0])
+            blocks = columns[source]
+            blocks["Start"].append(tstart)
+            blocks["End"].append(tstart + size)
+            blocks["DestStart"].append(qstart)
+            blocks["DestSize"].append(qsize)
+            blocks["Reverse"].append(qstrand == "-")
+            blocks["DestChrom"].append(dest)
+            if len(values) == 3:
+                tstart += size + int(values[1])
+                qstart += size + int(values[2])
+        blocks = dict()
+        for source, data in columns.items():
+            data = {key: np.array(values) for key, values in data.items()}
+            order = np.argsort(data["Start"], kind="stable")
+            blocks[source] = {key: values[order] for key, values in data.items()}
+            blocks[source]["MaxEnd"] = np.maximum.accumulate(blocks[source]["End"])
+        return LiftOver(blocks)
+
+    def map(self, chrom, positions):
+        """Map a batch of 1-based positions on a chromosome to the destination assembly
+
+        Returns arrays of the destination chromosome and position of each input position, and a
+        mask indicating which positions could be mapped to exactly one destination; the destination
+        coordinates of unmapped positions are undefined.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        if chrom not in self.blocks:
+            unmapped = np.zeros(len(positions), dtype=bool)
+            return np.full(len(positions), None), positions.copy(), unmapped
+        blocks = self.blocks[chrom]
+        starts = positions - 1
+        candidate = np.searchsorted(blocks["Start"], starts, side="right") - 1
+        index = np.zeros(len(positions), dtype=np.int64)
+        hits = np.zeros(len(positions), dtype=np.int64)
+        active = np.flatnonzero(candidate >= 0)
+        while len(active) > 0:
+            current = candidate[active]
+            covered = starts[active] < blocks["End"][current]
+            first = covered & (hits[active] == 0)
+            index[active[first]] = current[first]
+            hits[active[covered]] += 1
+            candidate[active] -= 1
+            previous = np.maximum(candidate[active], 0)
+            keep = (candidate[active] >= 0) & (blocks["MaxEnd"][previous] > starts[active])
+            active = active[keep & (hits[active] < 2)]
+        mapped = hits == 1
+        dest = blocks["DestStart"][index] + starts - blocks["Start"][index]
+        reverse = blocks["Reverse"][index]
+        dest[reverse] = blocks["DestSize"][index][reverse] - dest[reverse] - 1
+        return blocks["DestChrom"][index], dest + 1, mapped
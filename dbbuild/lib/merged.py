@@ -0,0 +1,134 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+from array import array
+from collections.abc import Mapping
+import json
+import numpy as np
+import os
+import pandas as pd
+from pathlib import Path
+from warnings import warn
+
+
+class MergeIndex(Mapping):
+    """Memory-mapped index of dbSNP rsID merges
+
+    The dbSNP merge history maps each retired rsID to the rsID it was merged into. The index stores
+    the numeric part of the retired rsIDs in sorted order and the corresponding merged-into rsIDs
+    as a single 2 × N array of 64-bit integers in NumPy's `.npy` format, so that it can be
+    memory-mapped and each lookup is a binary search over the retired rsIDs. The full merge table
+    is never loaded into memory.
+
+    The index behaves as a read-only mapping of rsID strings.
+
+    >>> index = MergeIndex(np.array([[5, 9], [1, 2]]))
+    >>> index["rs9"]
+    'rs2'
+    >>> "rs7" in index, index.get("rs7")
+    (False, None)
+    """
+
+    INDEX_FILE = "rsid-merges.npy"
+    SOURCE_FILES = ("refsnp-merged.csv.gz", "refsnp-merged.csv", "refsnp-merged.json")
+
+    def __init__(self, data):
+        self.sources = data[0]
+        self.targets = data[1]
+
+    @classmethod
+    def load(cls, dbsnp_path, index_file=None):
+        """Load the merge index, building it first if necessary
+
+        The index is (re)built whenever it is missing or older than the dbSNP merge history, which
+        is read from `refsnp-merged.csv.gz`, `refsnp-merged.csv`, or `refsnp-merged.json` in the
+        dbSNP directory, whichever is found first. The index is stored in `index_file`, by default
+        `rsid-merges.npy` in the working directory, since the dbSNP directory may be read-only.
+        """
+        index_file = Path(cls.INDEX_FILE if index_file is None else index_file)
+        sources = [Path(dbsnp_path) / name for name in cls.SOURCE_FILES]
+        sources = [path for path in sources if path.is_file()]
+        if len(sources) == 0 and not index_file.is_file():
+            raise FileNotFoundError(Path(dbsnp_path) / cls.SOURCE_FILES[-1])
+        if len(sources) > 0:
+            source = sources[0]
+            if not index_file.is_file() or source.stat().st_mtime > index_file.stat().st_mtime:
+                cls.build(source, index_file)
+        return cls(np.load(index_file, mmap_mode="r"))
+
+    @staticmethod
+    def build(source, index_file):
+        """Build the merge index from a CSV or JSON copy of the dbSNP merge history"""
+        if Path(source).suffix == ".json":
+            sources, targets = MergeIndex.parse_json(source)
+        else:
+            sources, targets = MergeIndex.parse_csv(source)
+        order = np.argsort(sources, kind="stable")
+        sources, targets = sources[order], targets[order]
+        last = np.append(sources[1:] != sources[:-1], True)
+        tempfile = Path(index_file).with_suffix(".tmp")
+        with open(tempfile, "wb") as fh:
+            np.save(fh, np.vstack([sources[last], targets[last]]))
+        os.replace(tempfile, index_file)
+
+    @staticmethod
+    def parse_csv(path, chunksize=10_000_000):
+        sources, targets = list(), list()
+        for chunk in pd.read_csv(path, dtype=str, chunksize=chunksize):
+            sources.append(chunk.Source.str.slice(2).astype(np.int64).to_numpy())
+            targets.append(chunk.Target.str.slice(2).astype(np.int64).to_numpy())
+        if len(sources) == 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+        return np.concatenate(sources), np.concatenate(targets)
+
+    @staticmethod
+    def parse_json(path, updateint=1e6):
+        sources, targets = array("q"), array("q")
+        threshold = updateint
+        with open(path, "r") as instream:
+            for n, line in enumerate(instream):
+                try:
+                    data = json.loads(line)
+                except Exception:
+                    warn(f"Could not parse line {n+1}, skipping: {line}")
+                    continue
+                source = int(data["refsnp_id"])
+                for target in data["merged_snapshot_data"]["merged_into"]:
+                    sources.append(source)
+                    targets.append(int(target))
+                if n >= threshold:
+                    threshold += updateint
+                    if threshold == updateint * 10:
+                        updateint = threshold
+                    print(f"processed {n} rows")
+        return np.frombuffer(sources, dtype=np.int64), np.frombuffer(targets, dtype=np.int64)
+
+    @staticmethod
+    def rsid_number(rsid):
+        if not isinstance(rsid, str) or not rsid.startswith("rs") or not rsid[2:].isdigit():
+            return None
+        return int(rsid[2:])
+
+    def __getitem__(self, rsid):
+        number = MergeIndex.rsid_number(rsid)
+        if number is not None:
+            i = np.searchsorted(self.sources, number)
+            if i < len(self.sources) and self.sources[i] == number:
+                return f"rs{self.targets[i]}"
+        raise KeyError(rsid)
+
+    def __iter__(self):
+        for number in self.sources:
+            yield f"rs{number}"
+
+    def __len__(self):
+        return len(self.sources)
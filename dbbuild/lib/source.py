@@ -19,6 +19,7 @@ from io import StringIO
 import json
 import pandas as pd
 from pathlib import Path
+import sys
 
 
 class DataSource:
@@ -138,20 +139,57 @@ class DataSource:
 
 
 class SourceIndex:
-    def __init__(self, rootdir, dbsnp_path, chain_path, exclude=[]):
+    def __init__(
+        self,
+        rootdir,
+        dbsnp_path,
+        chain_path,
+        exclude=[],
+        cache=None,
+        incremental=False,
+        coord_cache=None,
+        threads=1,
+    ):
         self.rootdir = Path(rootdir)
         self.dbsnp_path = Path(dbsnp_path)
         self.chain_path = Path(chain_path)
         self.exclusion_list = exclude
+        self.cache = cache
+        self.coord_cache = coord_cache
+        self.incremental = incremental
+        self.threads = threads
         self.populate_variants()
         self.populate_sources()
         self._markers = list()
         self.interval_index = IntervalIndex()
 
     def populate_variants(self):
-        csvs = self.rootdir.glob("*/marker.csv")
+        csvs = sorted(self.rootdir.glob("*/marker.csv"))
         table = VariantIndex.table_from_filenames(csvs)
-        self.variant_index = VariantIndex(table, self.dbsnp_path, self.chain_path)
+        cached, stale = list(), list()
+        for csv in csvs:
+            lookups = None
+            if self.cache is not None and self.incremental:
+                lookups = self.cache.load(csv.parent)
+            if lookups is None:
+                stale.append(csv)
+            else:
+                cached.append(lookups)
+        if self.cache is not None:
+            message = f"[build cache] reusing variant data for {len(cached)} sources, resolving {len(stale)}"
+            print(message, file=sys.stderr)
+        self.variant_index = VariantIndex(
+            table,
+            self.dbsnp_path,
+            self.chain_path,
+            cached=cached,
+            coord_cache=self.coord_cache,
+            threads=self.threads,
+        )
+        if self.cache is not None:
+            for csv in stale:
+                lookups = self.variant_index.lookups(pd.read_csv(csv))
+                self.cache.save(csv.parent, lookups)
 
     def populate_sources(self):
         self.sources = list()
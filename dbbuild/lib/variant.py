@@ -10,15 +10,16 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
+from .liftover import LiftOver
+from .merged import MergeIndex
 from collections import defaultdict
 from dataclasses import dataclass
-import json
+import gzip
+from multiprocessing import Pool
 import pandas as pd
 from pathlib import Path
 import rsidx
 import sqlite3
-import subprocess
-from tempfile import TemporaryDirectory
 from warnings import warn
 
 
@@ -36,37 +37,139 @@ class VariantList:
 
 
 class VariantIndex:
-    def __init__(self, table, dbsnp_path, chain_path):
+    def __init__(self, table, dbsnp_path, chain_path, cached=(), coord_cache=None, threads=1):
         self.table = table
         self.dbsnp_path = Path(dbsnp_path)
         self.chain_path = Path(chain_path)
+        self.coord_cache = coord_cache
+        self.threads = threads
         self.coords_by_rsid = dict(GRCh37=dict(), GRCh38=dict())
         self.position_mapping = dict(GRCh37=defaultdict(dict), GRCh38=defaultdict(dict))
+        for lookups in cached:
+            self.preload(lookups)
         self.resolve_all_rsids()
         self.map_all_positions()
 
+    def preload(self, lookups):
+        """Add rsID coordinates and liftOver results from a previous build
+
+        Only rsIDs and positions not already present in the index are resolved against dbSNP and
+        lifted over, so preloading the results for unchanged sources (see `BuildCache`) limits
+        this work to new or updated sources.
+        """
+        for refr, coords in lookups["coords"].items():
+            self.coords_by_rsid[refr].update(coords)
+        for refr, mapping in lookups["positions"].items():
+            for chrom, positions in mapping.items():
+                self.position_mapping[refr][chrom].update(
+                    {int(source): dest for source, dest in positions.items()}
+                )
+
+    def lookups(self, table):
+        """Collect the rsID coordinates and liftOver results needed for the markers in a table"""
+        coords = dict(GRCh37=dict(), GRCh38=dict())
+        for refr in coords:
+            for rsid, chrom in VariantIndex.table_rsids(table, self.merged_rsids):
+                while rsid not in self.coords_by_rsid[refr] and rsid in self.merged_rsids:
+                    rsid = self.merged_rsids[rsid]
+                if rsid in self.coords_by_rsid[refr]:
+                    coords[refr][rsid] = int(self.coords_by_rsid[refr][rsid])
+        positions = dict(GRCh37=defaultdict(dict), GRCh38=defaultdict(dict))
+        for refr in positions:
+            for chrom, start, end in VariantIndex.table_positions(table, refr):
+                if end in self.position_mapping[refr][chrom]:
+                    positions[refr][chrom][end] = int(self.position_mapping[refr][chrom][end])
+        return dict(coords=coords, positions=positions)
+
     @staticmethod
     def table_from_filenames(filenames):
         return pd.concat([pd.read_csv(fn) for fn in filenames]).reset_index()
 
     def resolve_all_rsids(self):
         self.load_merged_rsids()
-        rsids = set(self.all_rsids())
-        vcf = self.dbsnp_path / "dbSNP_GRCh37.vcf.gz"
-        idx = self.dbsnp_path / "dbSNP_GRCh37.rsidx"
-        VariantIndex.rsidx_search(rsids, vcf, idx, self.coords_by_rsid["GRCh37"])
-        vcf = self.dbsnp_path / "dbSNP_GRCh38.vcf.gz"
-        idx = self.dbsnp_path / "dbSNP_GRCh38.rsidx"
-        VariantIndex.rsidx_search(rsids, vcf, idx, self.coords_by_rsid["GRCh38"])
+        chroms = dict(self.all_rsids())
+        unresolved, builds = dict(), dict()
+        for refr in ("GRCh37", "GRCh38"):
+            unresolved[refr] = set(chroms) - set(self.coords_by_rsid[refr])
+            if self.coord_cache is not None and len(unresolved[refr]) > 0:
+                builds[refr] = VariantIndex.dbsnp_build(self.dbsnp_path / f"dbSNP_{refr}.vcf.gz")
+                cached = self.coord_cache.lookup(builds[refr], refr, unresolved[refr])
+                self.coords_by_rsid[refr].update(
+                    {rsid: pos for rsid, pos in cached.items() if pos is not None}
+                )
+                unresolved[refr] -= set(cached)
+        coords = VariantIndex.search_dbsnp(self.dbsnp_path, unresolved, chroms, self.threads)
+        for refr, found in coords.items():
+            self.coords_by_rsid[refr].update(found)
+            if self.coord_cache is not None and len(unresolved[refr]) > 0:
+                misses = {rsid: found.get(rsid) for rsid in unresolved[refr]}
+                self.coord_cache.store(builds[refr], refr, misses)
+
+    @staticmethod
+    def search_dbsnp(dbsnp_path, rsids, chroms, threads=1, chunksize=5000):
+        """Search dbSNP for the specified rsIDs of each assembly
+
+        The rsIDs for each assembly are split into batches by chromosome, with no more than
+        `chunksize` rsIDs per batch, and with `threads` greater than 1 the batches for both
+        assemblies are searched in parallel. Returns a dictionary of rsID coordinates for each
+        assembly.
+        """
+        batches = list()
+        for refr, refr_rsids in rsids.items():
+            vcf = Path(dbsnp_path) / f"dbSNP_{refr}.vcf.gz"
+            idx = Path(dbsnp_path) / f"dbSNP_{refr}.rsidx"
+            by_chrom = defaultdict(list)
+            for rsid in refr_rsids:
+                by_chrom[chroms[rsid]].append(rsid)
+            for chrom in sorted(by_chrom):
+                batch = sorted(by_chrom[chrom], key=lambda rsid: (len(rsid), rsid))
+                for start in range(0, len(batch), chunksize):
+                    batches.append((refr, batch[start : start + chunksize], vcf, idx))
+        if threads > 1 and len(batches) > 1:
+            with Pool(min(threads, len(batches))) as pool:
+                results = pool.starmap(VariantIndex.search_batch, batches)
+        else:
+            results = [VariantIndex.search_batch(*batch) for batch in batches]
+        coords = {refr: dict() for refr in rsids}
+        for refr, found in results:
+            coords[refr].update(found)
+        return coords
+
+    @staticmethod
+    def search_batch(refr, rsids, vcf, idx):
+        coords = dict()
+        VariantIndex.rsidx_search(rsids, vcf, idx, coords)
+        return refr, coords
+
+    @staticmethod
+    def dbsnp_build(vcf):
+        """Identify the dbSNP build of a VCF file from its header
+
+        If the header does not declare a build ID, the file's name, size, and modification time
+        are used instead.
+        """
+        with gzip.open(vcf, "rt") as fh:
+            for line in fh:
+                if not line.startswith("##"):
+                    break
+                if line.startswith("##dbSNP_BUILD_ID="):
+                    return line.strip().split("=", 1)[1]
+        stat = Path(vcf).stat()
+        return f"{Path(vcf).name}:{stat.st_size}:{stat.st_mtime_ns}"
 
     def all_rsids(self):
-        for n, row in self.table.iterrows():
+        return VariantIndex.table_rsids(self.table, self.merged_rsids)
+
+    @staticmethod
+    def table_rsids(table, merged_rsids):
+        """Yield each rsID in a marker table, and any rsID it was merged into, with its chromosome"""
+        for n, row in table.iterrows():
             if pd.isna(row.VarRef):
                 continue
             for rsid in row.VarRef.split(";"):
-                yield rsid
-                if rsid in self.merged_rsids:
-                    yield self.merged_rsids[rsid]
+                yield rsid, row.Chrom
+                if rsid in merged_rsids:
+                    yield merged_rsids[rsid], row.Chrom
 
     @staticmethod
     def rsidx_search(rsids, vcf, idx, vardict):
@@ -80,60 +183,37 @@ class VariantIndex:
                 assert ";" not in rsid
                 vardict[rsid] = pos
 
-    def load_merged_rsids(self, updateint=1e6):
-        merged_file = self.dbsnp_path / "refsnp-merged.csv.gz"
-        if not merged_file.is_file():
-            merged_file = self.dbsnp_path / "refsnp-merged.csv"
-        if merged_file.is_file():
-            table = pd.read_csv(merged_file)
-            self.merged_rsids = dict(zip(table.Source, table.Target))
-        else:
-            merged_file = self.dbsnp_path / "refsnp-merged.json"
-            if not merged_file.is_file():
-                raise FileNotFoundError(merged_file)
-            self.merged_rsids = dict()
-            threshold = updateint
-            with open(merged_file, "r") as instream:
-                for n, line in enumerate(instream):
-                    try:
-                        data = json.loads(line)
-                    except Exception:
-                        warn(f"Could not parse line {n+1}, skipping: {line}")
-                        continue
-                    source = data["refsnp_id"]
-                    targets = data["merged_snapshot_data"]["merged_into"]
-                    for target in targets:
-                        self.merged_rsids[f"rs{source}"] = f"rs{target}"
-                    if n >= threshold:
-                        threshold += updateint
-                        if threshold == updateint * 10:
-                            updateint = threshold
-                        print(f"processed {n} rows")
-            table = pd.DataFrame(self.merged_rsids.items(), columns=["Source", "Target"])
-            table.to_csv(self.dbsnp_path / "refsnp-merged.csv", index=False)
+    def load_merged_rsids(self):
+        """Open the memory-mapped index of dbSNP rsID merges, building it on first use"""
+        self.merged_rsids = MergeIndex.load(self.dbsnp_path)
 
     def map_all_positions(self):
         self.map_all_positions_for_refr("GRCh37", self.chain_path / "hg19ToHg38.over.chain.gz")
         self.map_all_positions_for_refr("GRCh38", self.chain_path / "hg38ToHg19.over.chain.gz")
 
     def map_all_positions_for_refr(self, refr, chain):
-        with TemporaryDirectory() as tmpdir:
-            source_file = Path(tmpdir) / f"{refr}-source.bed"
-            dest_file = Path(tmpdir) / f"{refr}-dist.bed"
-            unmapped_file = Path(tmpdir) / f"{refr}-unmapped.bed"
-            source_positions = pd.DataFrame(
-                self.all_positions(refr), columns=["Chrom", "Start", "End"]
-            )
-            source_positions.to_csv(source_file, sep="\t", header=False, index=False)
-            args = map(str, ["liftOver", source_file, chain, dest_file, unmapped_file])
-            subprocess.run(args)
-            assert unmapped_file.stat().st_size == 0
-            dest_positions = pd.read_csv(dest_file, sep="\t", names=["Chrom", "Start", "End"])
-            for source, dest in zip(source_positions.iterrows(), dest_positions.iterrows()):
-                self.position_mapping[refr][source[1].Chrom][source[1].End] = dest[1].End
+        """Lift over all positions not already mapped, warning about any that cannot be mapped"""
+        mapping = self.position_mapping[refr]
+        unmapped = [pos for pos in self.all_positions(refr) if pos[2] not in mapping[pos[0]]]
+        if len(unmapped) == 0:
+            return
+        liftover = LiftOver.load(chain)
+        positions = pd.DataFrame(unmapped, columns=["Chrom", "Start", "End"])
+        failed = list()
+        for chrom, group in positions.groupby("Chrom", sort=False):
+            ends = group.End.to_numpy()
+            dest_chroms, dest_ends, mapped = liftover.map(chrom, ends)
+            mapping[chrom].update(zip(ends[mapped].tolist(), dest_ends[mapped].tolist()))
+            failed.extend(f"{chrom}:{end}" for end in ends[~mapped])
+        if len(failed) > 0:
+            warn(f"could not lift over {len(failed)} {refr} positions: {', '.join(failed)}")
 
     def all_positions(self, refr):
-        for n, row in self.table.iterrows():
+        return VariantIndex.table_positions(self.table, refr)
+
+    @staticmethod
+    def table_positions(table, refr):
+        for n, row in table.iterrows():
             if pd.isna(row.Refr) or row.Refr != refr:
                 continue
             for position in row.Positions.split(";"):
@@ -12,6 +12,7 @@
 # -------------------------------------------------------------------------------------------------
 
 from argparse import ArgumentParser
+from microhapdb.ae import compute_aes
 import pandas as pd
 import sys
 
@@ -20,13 +21,7 @@ def compute_marker_aes(freqfile, popsfile):
     freqs = pd.read_csv(freqfile)
     sample_pops = pd.read_csv(popsfile, sep="\t")
     pops1kgp = set(sample_pops.Population)
-    aedata = list()
-    for marker, mdata in freqs[freqs.Population.isin(pops1kgp)].groupby("Marker"):
-        for population, pdata in mdata.groupby("Population"):
-            ae = 1.0 / sum([f**2 for f in pdata.Frequency])
-            entry = (marker, population, ae)
-            aedata.append(entry)
-    table = pd.DataFrame(aedata, columns=["Marker", "Population", "Ae"])
+    table = compute_aes(freqs[freqs.Population.isin(pops1kgp)])
     return table.sort_values(["Marker", "Population"])
 
 
@@ -0,0 +1,36 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+import pytest
+from types import SimpleNamespace
+from util import GenotypeIndexer
+
+
+def mock_record(calls):
+    samples = {f"S{n}": {"GT": call} for n, call in enumerate(calls)}
+    return SimpleNamespace(samples=samples)
+
+
+@pytest.mark.parametrize(
+    "calls,expected",
+    [
+        ([(0, 1), (1, 1), (0, 0)], [[0, 1], [1, 1], [0, 0]]),
+        ([(0, 1), (None, 1)], [[0, 1], [-1, 1]]),
+        ([(0,), (1,), (1,)], [[0, -2], [1, -2], [1, -2]]),
+        ([(0,), (1,), (1,), (0,)], [[0, -2], [1, -2], [1, -2], [0, -2]]),
+        ([(0,), (1, 0), (None,), (1,)], [[0, -2], [1, 0], [-1, -2], [1, -2]]),
+    ],
+)
+def test_decode_genotypes(calls, expected):
+    indexer = GenotypeIndexer.__new__(GenotypeIndexer)
+    genotypes = indexer.decode_genotypes(mock_record(calls))
+    assert genotypes.tolist() == expected
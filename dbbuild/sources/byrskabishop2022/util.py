@@ -11,59 +11,129 @@
 # -------------------------------------------------------------------------------------------------
 
 from collections import Counter, defaultdict
+import gzip
+from microhapdb import ae
+from multiprocessing import Pool
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from pyfaidx import Fasta as FastaIdx
 from pysam import VariantFile
-
-
-def collect_haplotypes(markers, sample_pops, refr_file, vcfdir):
-    haplo_table = list()
-    for n, marker in markers.iterrows():
-        vcfs = list(Path(vcfdir).glob(f"*{marker.Chrom}.*.vcf.gz"))
-        if len(vcfs) != 1:
-            message = f"found {len(vcfs)} VCFs for {marker.Chrom} ($VCFDIR/*{marker.Chrom}.*.vcf.gz), expected 1"
-            raise FileNotFoundError(message)
-        gti = GenotypeIndexer(vcfs[0], refr_file)
-        positions = list(map(int, marker.Positions.split(";")))
-        for sample, hapl1, hapl2 in gti.get_haplotypes(marker.Chrom, positions):
-            if sample not in sample_pops:
-                continue
-            pop, superpop, gender = sample_pops[sample]
-            if marker.Chrom == "chrX" and gender == "male":
-                hapl2 = None
-            entry = (marker.Name, sample, pop, superpop, hapl1, hapl2)
-            haplo_table.append(entry)
-    colnames = ["Marker", "Sample", "Population", "Superpopulation", "Haplotype1", "Haplotype2"]
-    haplotypes = pd.DataFrame(haplo_table, columns=colnames)
-    return haplotypes
+from shutil import copyfileobj
+from tempfile import TemporaryDirectory
+
+
+def collect_haplotypes(markers, sample_pops, refr_file, vcfdir, outfile, threads=1):
+    """Collect the haplotypes of every sample at every marker and write them to `outfile`
+
+    Markers are processed by chromosome, with up to `threads` chromosomes processed in parallel.
+    Each worker streams its haplotypes to a temporary file, and these are concatenated once all
+    workers are finished. The output is therefore grouped by chromosome, in order of each
+    chromosome's first appearance in `markers`, with markers in input order within each chromosome.
+    """
+    with TemporaryDirectory() as tempdir:
+        jobs = list()
+        for chrom, chrom_markers in markers.groupby("Chrom", sort=False):
+            vcf = find_vcf(vcfdir, chrom)
+            partfile = Path(tempdir) / f"{chrom}.csv"
+            jobs.append((chrom_markers, sample_pops, refr_file, vcf, partfile))
+        with Pool(threads) as pool:
+            partfiles = pool.starmap(collect_chromosome_haplotypes, jobs)
+        with gzip.open(outfile, "wt") as fh:
+            print("Marker,Sample,Population,Superpopulation,Haplotype1,Haplotype2", file=fh)
+            for partfile in partfiles:
+                with open(partfile, "r") as infh:
+                    copyfileobj(infh, fh)
+
+
+def find_vcf(vcfdir, chrom):
+    vcfs = list(Path(vcfdir).glob(f"*{chrom}.*.vcf.gz"))
+    if len(vcfs) != 1:
+        message = f"found {len(vcfs)} VCFs for {chrom} ($VCFDIR/*{chrom}.*.vcf.gz), expected 1"
+        raise FileNotFoundError(message)
+    return vcfs[0]
+
+
+def collect_chromosome_haplotypes(markers, sample_pops, refr_file, vcf, outfile):
+    gti = GenotypeIndexer(vcf, refr_file)
+    keep = np.array([sample in sample_pops for sample in gti.samples])
+    samples = [sample for sample in gti.samples if sample in sample_pops]
+    pops, superpops, genders = zip(*[sample_pops[sample] for sample in samples])
+    males = np.array(genders) == "male"
+    with open(outfile, "w") as fh:
+        for marker in markers.itertuples():
+            positions = list(map(int, marker.Positions.split(";")))
+            hapl1, hapl2 = gti.get_haplotypes(marker.Chrom, positions)
+            hapl1, hapl2 = hapl1[keep], hapl2[keep]
+            if marker.Chrom == "chrX":
+                hapl2[males] = None
+            haplotypes = pd.DataFrame(
+                {
+                    "Marker": marker.Name,
+                    "Sample": samples,
+                    "Population": pops,
+                    "Superpopulation": superpops,
+                    "Haplotype1": hapl1,
+                    "Haplotype2": hapl2,
+                }
+            )
+            haplotypes.to_csv(fh, header=False, index=False)
+    return outfile
 
 
 class GenotypeIndexer:
+    MISSING = -1
+    UNSET = -2
+
     def __init__(self, vcf, refr_fasta):
         self.vcf = VariantFile(vcf)
         self.refrseq_index = FastaIdx(refr_fasta)
 
     def get_haplotypes(self, chrom, positions):
+        """Construct the haplotypes of every sample at the specified positions
+
+        Returns two arrays of haplotype strings, one for each copy of the chromosome, with samples
+        in VCF order. Missing alleles are reported as "None", and positions with no SNV record in
+        the VCF are reported with the reference allele.
+        """
         reference = self.get_reference_haplotype(chrom, positions)
         if len(reference) != len(positions):
             message = f"variant count mismatch: {len(reference)} vs {len(positions)}"
             raise ValueError(message)
-        haplotypes = dict()
-        for sample in self.samples:
-            haplotypes[sample] = (Haplotype(reference), Haplotype(reference))
+        shape = (len(self.samples), 2)
+        alleles = {pos: np.full(shape, refr, dtype=object) for pos, refr in reference.items()}
         for record in self.vcf.fetch(chrom, min(positions) - 1, max(positions)):
-            if record.pos not in positions:
+            if record.pos not in alleles:
+                continue
+            if any(len(allele) > 1 for allele in record.alleles):
                 continue
-            for allele in record.alleles:
-                if len(allele) > 1:
-                    break
-            else:
-                for sample in self.samples:
-                    for haplotype, allele in zip(haplotypes[sample], record.samples[sample].alleles):
-                        haplotype[record.pos] = allele
-        for sample in self.samples:
-            yield sample, haplotypes[sample][0], haplotypes[sample][1]
+            genotypes = self.decode_genotypes(record)
+            lookup = np.array(list(record.alleles) + ["None"], dtype=object)
+            unset = genotypes == self.UNSET
+            called = lookup[np.where(unset, 0, genotypes)]
+            alleles[record.pos] = np.where(unset, alleles[record.pos], called)
+        haplotypes = None
+        for column in alleles.values():
+            haplotypes = column if haplotypes is None else haplotypes + "|" + column
+        return haplotypes[:, 0], haplotypes[:, 1]
+
+    def decode_genotypes(self, record):
+        """Decode the genotype calls of a VCF record into an N x 2 array of allele indices
+
+        Missing alleles are encoded as `MISSING`, and the second allele of haploid calls as `UNSET`.
+        """
+        calls = [sample["GT"] for sample in record.samples.values()]
+        try:
+            genotypes = np.array(calls, dtype=np.int16)
+            if genotypes.shape == (len(calls), 2):
+                return genotypes
+        except (TypeError, ValueError):
+            pass
+        genotypes = np.full((len(calls), 2), self.UNSET, dtype=np.int16)
+        for i, call in enumerate(calls):
+            for j, allele in enumerate(call[:2]):
+                genotypes[i, j] = self.MISSING if allele is None else allele
+        return genotypes
 
     @property
     def samples(self):
@@ -73,31 +143,10 @@ class GenotypeIndexer:
         reference_haplotype = dict()
         for position in sorted(positions):
             allele = self.refrseq_index[chrom][position - 1]
-            reference_haplotype[position] = allele
+            reference_haplotype[position] = str(allele)
         return reference_haplotype
 
 
-class Haplotype:
-    def __init__(self, reference_positions):
-        self.alleles = {pos: allele for pos, allele in reference_positions.items()}
-
-    def __len__(self):
-        return len(self.alleles)
-
-    def __str__(self):
-        return "|".join(map(str, self.alleles.values()))
-
-    def __getitem__(self, position):
-        if position not in self.alleles:
-            raise IndexError(f"position {position} not set for this haplotype")
-        return self.alleles[position]
-
-    def __setitem__(self, position, allele):
-        if position not in self.alleles:
-            raise IndexError(f"position {position} not set for this haplotype")
-        self.alleles[position] = allele
-
-
 def compile_sample_populations(vcf_path, pop_table, pedigree, dofilters=True):
     vcf = VariantFile(vcf_path)
     samples = set(vcf.header.samples)
@@ -129,42 +178,43 @@ def summarize_population_groups(pedigree, superpops):
 
 
 def compile_frequencies(haplotypes):
-    table = list()
-    for freqdata in list_frequencies(haplotypes):
-        table.append(freqdata)
-    return pd.DataFrame(table, columns=["Marker", "Population", "Allele", "Frequency", "Count"])
-
-
-def list_frequencies(haplotypes):
+    """Compute haplotype frequencies for each population and superpopulation
+
+    The haplotypes can be provided as a single table or as an iterable of tables, such as the
+    chunks produced by `pd.read_csv(..., chunksize=N)`, so that memory use is bounded by the chunk
+    size rather than the total number of haplotypes. Samples from admixed populations are not
+    counted towards superpopulation frequencies.
+    """
+    if isinstance(haplotypes, pd.DataFrame):
+        haplotypes = [haplotypes]
+    counts = None
+    for chunk in haplotypes:
+        chunk_counts = tally_haplotypes(chunk)
+        counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+    counts = counts.astype(int).sort_index()
+    totals = counts.groupby(level=["Marker", "Population"]).transform("sum")
+    table = pd.DataFrame({"Frequency": counts / totals, "Count": totals}).reset_index()
+    return table[["Marker", "Population", "Allele", "Frequency", "Count"]]
+
+
+def tally_haplotypes(haplotypes):
     admixed = ("ACB", "ASW", "CLM", "MXL", "PEL", "PUR")
-    pop_tallies = defaultdict(lambda: defaultdict(Counter))
-    for n, row in haplotypes.iterrows():
-        for haplokey in ("Haplotype1", "Haplotype2"):
-            mhallele = [row[haplokey]]
-            if not pd.isna(mhallele):
-                pop_tallies[row["Marker"]][row["Population"]].update(mhallele)
-                if row["Population"] not in admixed:
-                    pop_tallies[row["Marker"]][row["Superpopulation"]].update(mhallele)
-    for marker, popcounts in sorted(pop_tallies.items()):
-        for population, haplocounts in sorted(popcounts.items()):
-            total_count = sum(haplocounts.values())
-            for mhallele, count in sorted(haplocounts.items()):
-                freq = count / total_count
-                yield marker, population, mhallele, freq, total_count
+    alleles = haplotypes.melt(
+        id_vars=["Marker", "Population", "Superpopulation"],
+        value_vars=["Haplotype1", "Haplotype2"],
+        value_name="Allele",
+    ).dropna(subset=["Allele"])
+    pop_counts = alleles.groupby(["Marker", "Population", "Allele"]).size()
+    alleles = alleles[~alleles.Population.isin(admixed)]
+    superpop_counts = alleles.groupby(["Marker", "Superpopulation", "Allele"]).size()
+    superpop_counts.index = superpop_counts.index.set_names("Population", level="Superpopulation")
+    counts = pd.concat([pop_counts, superpop_counts])
+    return counts.groupby(level=["Marker", "Population", "Allele"]).sum()
 
 
 def compute_aes(frequencies):
-    aes = list()
     superpops = ("AFR", "AMR", "EAS", "EUR", "SAS")
-    for marker, marker_data in frequencies.groupby("Marker"):
-        population_aes = list()
-        for population, pop_data in marker_data.groupby("Population"):
-            ae = 1.0 / sum([f**2 for f in pop_data.Frequency])
-            entry = (marker, population, ae)
-            aes.append(entry)
-            if population not in superpops:
-                population_aes.append(ae)
-        avg_ae = sum(population_aes) / len(population_aes)
-        entry = (marker, "1KGP", avg_ae)
-        aes.append(entry)
-    return pd.DataFrame(aes, columns=["Marker", "Population", "Ae"])
+    aes = ae.compute_aes(frequencies)
+    average_aes = aes[~aes.Population.isin(superpops)].groupby("Marker").Ae.mean().reset_index()
+    aes = pd.concat([aes, average_aes.assign(Population="1KGP")], ignore_index=True)
+    return aes.sort_values("Marker", kind="stable")[["Marker", "Population", "Ae"]]
@@ -10,13 +10,12 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
-from . import nomenclature
-from .tables import markers, merged, populations, frequencies, indels, variantmap, hg38
+from . import nomenclature, tables
 from .population import Population
 from .marker import Marker, Locus
+from .database import Database
 from microhapdb import cli
 from microhapdb import panel
-import pandas as pd
 from importlib.resources import files
 from ._version import get_versions
 
@@ -28,14 +27,22 @@ def data_file(path):
     return files("microhapdb") / "data" / path
 
 
+def __getattr__(name):
+    """Defer loading of the data tables until they're first accessed; see `microhapdb.tables`"""
+    if name in tables.loaders:
+        return getattr(tables, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def set_ae_population(popid="1KGP"):
+    """Set the population for the Ae values in `microhapdb.markers` for the entire process
+
+    This rebinds a module global and is not safe to call while other threads are querying the
+    database. To select Ae values for a single query, use the `ae_pop` parameter of the `Marker`
+    functions or a `microhapdb.Database` object.
+    """
     global markers
-    markers["Ae"] = None
-    aes = pd.read_csv(data_file("marker-aes.csv"))
-    if popid not in aes.Population.unique():
-        raise ValueError(f'no Ae data for population "{popid}"')
-    popaes = aes[aes.Population == popid].drop(columns=["Population"])
-    markers = markers.drop(columns=["Ae"]).join(popaes.set_index("Marker"), on="Name")
+    markers = tables.join_aes(tables.markers, popid=popid)
 
 
 def retrieve_by_id(ident):
@@ -59,24 +66,7 @@ def retrieve_by_id(ident):
     53  MHDBP-63967b883e  Japanese  Hiroaki2015
     54         SA000010B  Japanese     Kidd2018
     """
-
-    def id_in_series(ident, series):
-        return series.str.contains(ident).any()
-
-    id_in_pop_ids = id_in_series(ident, populations.ID)
-    id_in_pop_names = id_in_series(ident, populations.Name)
-    id_in_variants = id_in_series(ident, variantmap.Variant)
-    id_in_marker_names = id_in_series(ident, markers.Name)
-    if id_in_pop_ids or id_in_pop_names:
-        return Population.table_from_ids([ident])
-    elif id_in_variants or id_in_marker_names:
-        return Marker.table_from_ids([ident])
-    else:
+    table, notfound = Database().lookup([ident])
+    if len(notfound) > 0:
         raise ValueError(f'identifier "{ident}" not found in MicroHapDB')
-
-
-set_ae_population("1KGP")
-
-from . import _version
-
-__version__ = _version.get_versions()["version"]
+    return table.drop(columns=["Input"])
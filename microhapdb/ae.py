@@ -0,0 +1,48 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+"""Effective number of alleles (Ae)
+
+The effective number of alleles of a marker in a population is the reciprocal of the sum of its
+squared allele frequencies. It is computed here in bulk, with a single grouped sum over all markers
+and populations, both when building the database and at runtime.
+"""
+
+import pandas as pd
+
+
+def compute_aes(frequencies):
+    """Compute the Ae of each marker in each population of a frequency table
+
+    >>> freqs = pd.DataFrame(
+    ...     {
+    ...         "Marker": ["mh1", "mh1", "mh1", "mh1", "mh2"],
+    ...         "Population": ["P1", "P1", "P2", "P2", "P1"],
+    ...         "Frequency": [0.5, 0.5, 0.9, 0.1, 1.0],
+    ...     }
+    ... )
+    >>> compute_aes(freqs)
+      Marker Population        Ae
+    0    mh1         P1  2.000000
+    1    mh1         P2  1.219512
+    2    mh2         P1  1.000000
+    """
+    squares = frequencies[["Marker", "Population"]].assign(Square=frequencies.Frequency**2)
+    sums = squares.groupby(["Marker", "Population"], observed=True).Square.sum()
+    return (1.0 / sums).rename("Ae").reset_index()
+
+
+def population_aes(frequencies, popid):
+    """Compute the Ae of each marker in the specified population"""
+    aes = compute_aes(frequencies[frequencies.Population == popid])
+    return aes.drop(columns=["Population"])
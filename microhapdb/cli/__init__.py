@@ -12,11 +12,14 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
-from . import lookup, marker, population, frequency, summarize
+from . import lookup, marker, population, frequency, serve, summarize
 from argparse import ArgumentParser, RawDescriptionHelpFormatter
 import microhapdb
+from microhapdb.sequence import MissingSequenceError, marker_context, pack_genome
+import os
 from pyfaidx import Fasta as FastaIdx
 from subprocess import run
+import sys
 from urllib.request import urlretrieve
 
 
@@ -26,6 +29,7 @@ subparser_funcs = {
     "population": population.subparser,
     "frequency": frequency.subparser,
     "summarize": summarize.subparser,
+    "serve": serve.subparser,
 }
 
 mains = {
@@ -34,6 +38,7 @@ mains = {
     "population": population.main,
     "frequency": frequency.main,
     "summarize": summarize.main,
+    "serve": serve.main,
 }
 
 bubbletext = r"""
@@ -60,10 +65,28 @@ def main(args=None):
         raise SystemExit()
     if args.download:  # pragma: no cover
         download_hg38()
+        if args.compact:
+            compact_hg38(flank=args.flank, remove=True)
+        raise SystemExit()
+    if args.compact:
+        compact_hg38(flank=args.flank)
         raise SystemExit()
     assert args.cmd in mains
     mainmethod = mains[args.cmd]
-    mainmethod(args)
+    try:
+        mainmethod(args)
+    except BrokenPipeError:
+        # Output was piped to a program that exited early, such as `head`. Point standard output
+        # at /dev/null so that the interpreter does not fail again when flushing it at exit.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        raise SystemExit(1)
+    except MissingSequenceError as error:
+        message = (
+            f"error: {error}, which stores only the GRCh38 sequence near each marker; run "
+            "`microhapdb --download` to install the full genome"
+        )
+        raise SystemExit(message)
 
 
 def get_parser():
@@ -80,6 +103,19 @@ def get_parser():
         "-f", "--files", action="store_true", help="print data table filenames and exit"
     )
     cli.add_argument("--download", action="store_true", help="download the GRCh38 genome and exit")
+    cli.add_argument(
+        "--compact",
+        action="store_true",
+        help="store only the GRCh38 sequence near each marker in a compact 2-bit packed file and "
+        "exit; when combined with --download, the full genome FASTA is removed after packing",
+    )
+    cli.add_argument(
+        "--flank",
+        type=int,
+        metavar="F",
+        help="with --compact, store F bp of sequence on either side of each marker; by default, "
+        "F=1000",
+    )
     subcommandstr = ", ".join(sorted(subparser_funcs.keys()))
     subparsers = cli.add_subparsers(dest="cmd", metavar="cmd", help=subcommandstr)
     for func in subparser_funcs.values():
@@ -102,3 +138,14 @@ def download_hg38():  # pragma: no cover
     run(["gunzip", pathgz])
     hg38 = FastaIdx(path)
     _ = hg38["chr13"][53486574:53486837]  # Ensure index is built
+
+
+def compact_hg38(flank=None, remove=False):
+    flank = 1000 if flank is None else flank
+    path = microhapdb.data_file("hg38.fasta")
+    hg38 = FastaIdx(path)
+    intervals = marker_context(microhapdb.markers, flank=flank)
+    pack_genome(hg38, microhapdb.data_file("hg38.pack"), intervals=intervals)
+    if remove:  # pragma: no cover
+        os.remove(path)
+        os.remove(f"{path}.fai")
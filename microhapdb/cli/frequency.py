@@ -10,9 +10,9 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
+from .output import write_table
 from argparse import RawDescriptionHelpFormatter
 import microhapdb
-from microhapdb import Marker, Population
 from numpy import float64
 import pandas as pd
 import sys
@@ -21,43 +21,40 @@ from warnings import warn
 
 
 def main(args):
+    result = query(args)
+    if len(result) == 0:
+        return
+    display(result, args.format, args.population)
+
+
+def query(args):
     markers = args.marker
     if args.panel:
         with open(args.panel, "r") as fh:
             markers = fh.read().strip().split()
-    result = apply_filters(markers, args.population, args.allele)
-    if len(result) == 0:
-        return
-    display(result, args.format, args.population)
+    return apply_filters(markers, args.population, args.allele)
 
 
 def apply_filters(markers=None, populations=None, allele=None):
-    result = microhapdb.frequencies
-    if markers:
-        markers = Marker.standardize_ids(markers)
-        result = result[result.Marker.isin(markers)]
-    if populations:
-        populations = Population.standardize_ids(populations)
-        result = result[result.Population.isin(populations)]
-    if allele:
-        result = result[result.Allele == allele]
-    return result
+    return microhapdb.Database().frequency_table(
+        markers=markers or None, populations=populations or None, allele=allele or None
+    )
 
 
 def display(result, view_format, population):
     if view_format == "table":
-        result.to_csv(sys.stdout, sep="\t", index=False)
+        write_table(result, index=False)
     elif view_format == "mhpl8r":
         npop = len(result.Population.unique())
         if npop > 1:
             warn(f"frequencies for {npop} populations recovered, expected only 1", UserWarning)
         result = result[["Marker", "Allele", "Frequency"]].rename(columns={"Allele": "Haplotype"})
-        result.to_csv(sys.stdout, sep="\t", index=False)
+        write_table(result, index=False)
     elif view_format == "efm":
         if population is None or len(population) != 1:
             raise ValueError("must specify one and only one population with --format=efm")
         result = construct_frequency_table(population[0], result.Marker.unique())
-        result.to_csv(sys.stdout)
+        write_table(result, sep=",")
     else:
         raise ValueError(f'unsupported view format "{view_format}"')
 
@@ -92,18 +89,13 @@ def subparser(subparsers):
 
 def construct_frequency_table(pop, panel):
     frequencies = microhapdb.frequencies
-    frequencies = frequencies[frequencies.Marker.isin(panel)]
-    marker_indices = {marker: i for i, marker in enumerate(panel)}
-    haplotypes = order_haplotypes(panel, pop, frequencies)
-    table = pd.DataFrame(index=haplotypes, columns=sorted(panel), dtype=float64)
+    subset = frequencies[(frequencies.Population == pop) & (frequencies.Marker.isin(panel))]
+    subset = subset.drop_duplicates(subset=["Marker", "Allele"], keep="last")
+    haplotypes = order_haplotypes(panel, pop, subset)
+    table = subset.pivot(index="Allele", columns="Marker", values="Frequency")
+    table = table.reindex(index=haplotypes, columns=sorted(panel)).astype(float64)
     table.index.name = "Allele"
-    for haplotype in haplotypes:
-        hapfreqs = [None] * len(panel)
-        subset = frequencies[(frequencies.Allele == haplotype) & (frequencies.Population == pop)]
-        for j, row in subset.iterrows():
-            index = marker_indices[row.Marker]
-            hapfreqs[index] = row.Frequency
-        table.loc[haplotype] = hapfreqs
+    table.columns.name = None
     nrows, ncols = table.shape
     print(
         f"[microhapdb] constructed frequency table for {nrows} haplotypes and {ncols} markers",
@@ -118,12 +110,9 @@ def order_haplotypes(markers, pop, frequencies):
     This ordering creates a pleasing arrangement of blocks of data along a single diagonal in the
     final output table, whereas other orderings result in a more chaotic organization.
     """
-    haplotypes = list()
-    for marker in sorted(markers):
-        subset = frequencies[(frequencies.Marker == marker) & (frequencies.Population == pop)]
-        for haplotype in sorted(subset.Allele):
-            if haplotype not in haplotypes:
-                haplotypes.append(haplotype)
+    subset = frequencies[(frequencies.Marker.isin(markers)) & (frequencies.Population == pop)]
+    pairs = sorted(zip(subset.Marker, subset.Allele))
+    haplotypes = list(dict.fromkeys(allele for marker, allele in pairs))
     print(
         f"[microhapdb] retrieved and ordered {len(haplotypes)} distinct haplotypes",
         file=sys.stderr,
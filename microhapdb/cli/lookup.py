@@ -12,12 +12,65 @@
 
 from argparse import RawDescriptionHelpFormatter
 import microhapdb
+import pandas as pd
+import sys
 from textwrap import dedent
+from warnings import warn
 
 
 def main(args):
-    result = microhapdb.retrieve_by_id(args.id)
-    print(result.to_string(index=False))
+    display(query(args))
+
+
+def display(result):
+    if len(result) > 0:
+        print(result.to_string(index=False))
+
+
+def query(args):
+    result, notfound = resolve(args)
+    if len(notfound) > 0:
+        message = f"{len(notfound)} identifier(s) not found in MicroHapDB: {', '.join(notfound)}"
+        warn(message, UserWarning)
+    return result
+
+
+def resolve(args):
+    """Retrieve records for the requested identifiers, and list any identifiers not found"""
+    identifiers = list(args.id)
+    if args.file:
+        identifiers.extend(read_identifiers(args.file))
+    if len(identifiers) == 0:
+        raise ValueError("no identifiers provided")
+    if args.fuzzy:
+        return search(identifiers, limit=args.limit)
+    elif len(identifiers) == 1 and not args.file:
+        return microhapdb.retrieve_by_id(identifiers[0]), list()
+    else:
+        return microhapdb.Database().lookup(identifiers)
+
+
+def search(queries, limit=10):
+    db = microhapdb.Database()
+    parts, notfound = list(), list()
+    for text in queries:
+        table = db.search(text, limit=limit, fuzzy=True)
+        if len(table) == 0:
+            notfound.append(text)
+        else:
+            parts.append(table)
+    if len(parts) == 0:
+        return pd.DataFrame(columns=["Input", "Match"]), notfound
+    if len(set(tuple(part.columns) for part in parts)) > 1:
+        parts = [part.convert_dtypes(convert_string=False) for part in parts]
+    return pd.concat(parts), notfound
+
+
+def read_identifiers(path):
+    if path == "-":
+        return sys.stdin.read().split()
+    with open(path, "r") as fh:
+        return fh.read().split()
 
 
 def subparser(subparsers):
@@ -27,6 +80,10 @@ def subparser(subparsers):
         microhapdb lookup rs10815466
         microhapdb lookup mh12KK-043
         microhapdb lookup Japanese
+        microhapdb lookup rs10815466 mh12KK-043 Japanese
+        microhapdb lookup --file identifiers.txt
+        microhapdb lookup --fuzzy japan mh17KK-01
+        cut -f 1 samples.tsv | microhapdb lookup --file -
     """
     epilog = dedent(epilog)
     subparser = subparsers.add_parser(
@@ -35,4 +92,28 @@ def subparser(subparsers):
         epilog=epilog,
         formatter_class=RawDescriptionHelpFormatter,
     )
-    subparser.add_argument("id", help="record identifier")
+    subparser.add_argument(
+        "--file",
+        metavar="FILE",
+        help="read whitespace-separated identifiers from FILE; use `-` to read from standard input",
+    )
+    subparser.add_argument(
+        "--fuzzy",
+        action="store_true",
+        help="search for records whose names or identifiers match each query exactly, by prefix, "
+        "by substring, or approximately, and report records for the best matches in rank order",
+    )
+    subparser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        metavar="N",
+        help="with --fuzzy, report records for at most N matches per query; by default N=10",
+    )
+    subparser.add_argument(
+        "id",
+        nargs="*",
+        help="record identifier(s); when more than one identifier is provided, results include "
+        'an "Input" column indicating which identifier matched each record, and any identifiers '
+        "that match no records are reported",
+    )
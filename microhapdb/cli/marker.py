@@ -11,19 +11,19 @@
 # -------------------------------------------------------------------------------------------------
 
 from argparse import RawDescriptionHelpFormatter
-from collections import defaultdict
+from .output import batched, write_aligned, write_records, write_table
+from itertools import groupby
 import microhapdb
 from microhapdb import Marker, Locus
 import pandas as pd
-import sys
 from textwrap import dedent
 
 
+BATCH_SIZE = 256
+
+
 def main(args):
-    if args.ae_pop:
-        microhapdb.set_ae_population(popid=args.ae_pop)
-    markerids = resolve_panel(args.panel) if args.panel else args.id
-    result = apply_filters(markerids, args.region, args.query)
+    result = query(args)
     if len(result) > 0:
         display(
             result,
@@ -34,9 +34,12 @@ def main(args):
             extend_mode=args.extend_mode,
             trunc=args.trunc,
         )
-    if args.ae_pop:
-        # Reset
-        microhapdb.set_ae_population(popid="1KGP")
+
+
+def query(args):
+    markerids = resolve_panel(args.panel) if args.panel else args.id
+    regions = read_regions_file(args.regions_file) if args.regions_file else None
+    return apply_filters(markerids, args.region, args.query, regions=regions, ae_pop=args.ae_pop)
 
 
 def resolve_panel(panel):
@@ -50,16 +53,29 @@ def resolve_panel(panel):
     return markerids
 
 
-def apply_filters(markerids=None, region=None, query=None):
-    result = microhapdb.markers
-    if region:
-        result = Marker.table_from_region(region)
-    if query:
-        result = result.query(query, engine="python")
-    if markerids:
-        markerids = Marker.standardize_ids(markerids)
-        result = result[result.Name.isin(markerids)]
-    return result
+def read_regions_file(path):
+    """Read genomic regions from a BED file
+
+    BED intervals are 0-based and half-open. Each is converted to the exclusive bounds used by
+    `Marker.table_from_region`, so that markers are selected if their extent overlaps the interval.
+    """
+    regions = list()
+    with open(path, "r") as fh:
+        for line in fh:
+            if line.strip() == "" or line.startswith(("#", "track", "browser")):
+                continue
+            values = line.split()
+            if len(values) < 3:
+                raise ValueError(f'cannot parse BED interval "{line.strip()}"')
+            chrom, start, end = values[0], int(values[1]), int(values[2])
+            regions.append((chrom, start, end + 1))
+    return regions
+
+
+def apply_filters(markerids=None, region=None, query=None, regions=None, ae_pop=None):
+    return microhapdb.Database(ae_pop=ae_pop).marker_table(
+        ids=markerids or None, region=region or None, regions=regions, query=query or None
+    )
 
 
 def display(
@@ -71,34 +87,43 @@ def display(
     extend_mode=0,
     trunc=True,
 ):
+    kwargs = dict(delta=delta, minlen=minlen, extendmode=extend_mode)
     if view_format == "table":
         result = subset_result(result, columns)
         if trunc:
-            print(result.to_string(index=False))
+            write_aligned(result)
         else:
-            result.to_csv(sys.stdout, sep="\t", index=False)
+            write_table(result, index=False)
+    elif view_format == "detail":
+        markers = Marker.objectify(result.sort_values("Name", kind="stable"), **kwargs)
+        for batch in batched(markers, BATCH_SIZE):
+            intervals = [(m.chrom, *m.target_interval) for m in batch]
+            with microhapdb.sequences.prefetched(intervals):
+                write_records(marker.detail for marker in batch)
+    elif view_format == "fasta":
+        for batch in batched(objectify_loci(result, **kwargs), BATCH_SIZE):
+            intervals = [(locus.chrom, *locus.target_interval) for locus in batch]
+            with microhapdb.sequences.prefetched(intervals):
+                write_records(locus.fasta for locus in batch)
+    elif view_format == "offsets":
+        for n, locus in enumerate(objectify_loci(result, **kwargs)):
+            table = locus.definition.rename(columns={"ChromOffset": "OffsetHg38"})
+            write_table(table, header=n == 0, index=False)
     else:
-        markers = list(
-            Marker.objectify(result, delta=delta, minlen=minlen, extendmode=extend_mode)
-        )
-        if view_format == "detail":
-            for marker in sorted(markers, key=lambda m: m.name):
-                print(marker.detail)
-        elif view_format == "fasta":
-            loci = defaultdict(Locus)
-            for marker in markers:
-                loci[marker.locus].markers.append(marker)
-            for locus in loci.values():
-                print(locus.fasta)
-        elif view_format == "offsets":
-            loci = defaultdict(Locus)
-            for marker in markers:
-                loci[marker.locus].markers.append(marker)
-            table = pd.concat([locus.definition for locus in loci.values()])
-            table = table.rename(columns={"ChromOffset": "OffsetHg38"})
-            table.to_csv(sys.stdout, sep="\t", index=False)
-        else:
-            raise ValueError(f'unsupported view format "{view_format}"')
+        raise ValueError(f'unsupported view format "{view_format}"')
+
+
+def objectify_loci(table, **kwargs):
+    """Lazily group markers into loci
+
+    Loci are reported in order of their first occurrence in the table, and the markers of each
+    locus in table order.
+    """
+    codes, uniques = pd.factorize(table.Name.str.split(".").str[0])
+    table = table.iloc[codes.argsort(kind="stable")]
+    markers = Marker.objectify(table, **kwargs)
+    for name, group in groupby(markers, key=lambda marker: marker.locus):
+        yield Locus(list(group))
 
 
 def subset_result(result, columns):
@@ -129,6 +154,7 @@ def subparser(subparsers):
         microhapdb marker --format=fasta --panel mypanel.txt
         microhapdb marker --format=detail --min-length=125 --extend-mode=3 MHDBM-dc55cd9e
         microhapdb marker --region=chr18:1-25000000 --columns nxcqa
+        microhapdb marker --regions-file=targets.bed
         microhapdb marker --query='Source == "ALFRED"' --ae-pop CEU
         microhapdb marker --query='Name.str.contains("PK")'
     """
@@ -155,11 +181,18 @@ def subparser(subparsers):
         metavar="FILE",
         help="file containing a list of marker names/identifiers," " one per line",
     )
-    retrieval.add_argument(
+    regions = retrieval.add_mutually_exclusive_group()
+    regions.add_argument(
         "--region",
         metavar="RGN",
         help="restrict results to the " "specified genomic region; format chrX:YYYY-ZZZZZ",
     )
+    regions.add_argument(
+        "--regions-file",
+        metavar="BED",
+        help="restrict results to markers overlapping any of the genomic regions in the "
+        "specified BED file",
+    )
     retrieval.add_argument(
         "--query", metavar="QRY", help="Retrieve records using a Pandas-style query"
     )
@@ -0,0 +1,67 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+from itertools import islice
+import sys
+
+
+def batched(iterable, size):
+    """Split an iterable into lists of up to `size` items, consuming it lazily
+
+    >>> list(batched("ABCDE", 2))
+    [['A', 'B'], ['C', 'D'], ['E']]
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+def write_records(records):
+    """Print each record from an iterable to standard output as soon as it is available"""
+    for record in records:
+        print(record)
+    sys.stdout.flush()
+
+
+def write_table(table, sep="\t", chunksize=10000, header=True, **kwargs):
+    """Write a table to standard output as delimited text, one chunk of rows at a time
+
+    Each chunk is formatted and flushed separately, so that output begins immediately and the
+    formatted text of no more than one chunk is held in memory at once.
+    """
+    for start in range(0, max(len(table), 1), chunksize):
+        chunk = table.iloc[start : start + chunksize]
+        chunk.to_csv(sys.stdout, sep=sep, header=header and start == 0, **kwargs)
+        sys.stdout.flush()
+
+
+def write_aligned(table, chunksize=10000):
+    """Write a table to standard output as aligned text, as `print(table.to_string(index=False))`
+
+    The width and number format of each column depend on all of its values, so each column is
+    formatted in full, one at a time. Rows are then assembled, written, and flushed in chunks,
+    rather than joining the entire table into a single string before any output is written.
+    """
+    if len(table) == 0 or len(table.columns) == 0:
+        print(table.to_string(index=False))
+        return
+    columns = list()
+    for n in range(len(table.columns)):
+        columns.append(table.iloc[:, [n]].to_string(index=False).split("\n"))
+    for start in range(0, len(table) + 1, chunksize):
+        rows = zip(*[column[start : start + chunksize] for column in columns])
+        sys.stdout.write("".join(" ".join(row) + "\n" for row in rows))
+        sys.stdout.flush()
@@ -17,12 +17,7 @@ from textwrap import dedent
 
 
 def main(args):
-    if args.query:
-        result = Population.table_from_query(args.query)
-    elif len(args.id) > 0:
-        result = Population.table_from_ids(args.id)
-    else:
-        result = microhapdb.populations
+    result = query(args)
     if len(result) == 0:
         return
     if args.format == "detail":
@@ -32,6 +27,15 @@ def main(args):
         print(result.to_string(index=False))
 
 
+def query(args):
+    if args.query:
+        return Population.table_from_query(args.query)
+    elif len(args.id) > 0:
+        return Population.table_from_ids(args.id)
+    else:
+        return microhapdb.populations
+
+
 def subparser(subparsers):
     epilog = """\
     Examples::
@@ -0,0 +1,257 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+from argparse import RawDescriptionHelpFormatter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+import microhapdb
+from microhapdb.cli import frequency, lookup, marker, population
+import os
+import socketserver
+import sys
+from textwrap import dedent
+from threading import Lock, local
+from urllib.parse import parse_qs, urlparse
+
+
+queries = {
+    "lookup": lookup.query,
+    "marker": marker.query,
+    "population": population.query,
+    "frequency": frequency.query,
+}
+
+output_lock = Lock()
+
+file_arguments = ("file", "panel", "regions_file")
+
+content_types = {
+    "text": "text/plain; charset=utf-8",
+    "tsv": "text/tab-separated-values; charset=utf-8",
+    "json": "application/json",
+}
+
+
+def main(args):
+    server = make_server(host=args.host, port=args.port, socket_path=args.socket)
+    address = args.socket if args.socket else "http://{}:{}".format(*server.server_address)
+    print(f"[MicroHapDB] serving requests at {address}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover
+        pass
+    finally:
+        server.server_close()
+        if args.socket:
+            os.remove(args.socket)
+
+
+def make_server(host="127.0.0.1", port=8000, socket_path=None, preload=True):
+    """Create a threaded server for handling MicroHapDB queries over HTTP
+
+    Requests are made with a path naming a subcommand and query parameters corresponding to the
+    subcommand's command-line arguments, e.g. `/marker?region=chr18:1-25000000&ae-pop=CEU`. Repeat
+    the `id` parameter to specify multiple identifiers, and leave flag values empty, e.g.
+    `/marker?notrunc&id=mh01KK-117`. The `output` parameter selects the response format: `text`
+    (the default) for output identical to the command-line interface, or `tsv` or `json` for the
+    result table. Arguments that read files (`file`, `panel`, and `regions-file`) are not
+    supported; identifiers that match no records in a `lookup` request are listed in the
+    `X-MicroHapDB-Not-Found` response header.
+
+    The server listens on the specified TCP host and port, or on a Unix domain socket if
+    `socket_path` is specified. With `preload=True`, all data tables are loaded before the server
+    is returned.
+    """
+    if preload:
+        for table in microhapdb.tables.loaders:
+            getattr(microhapdb.tables, table)
+    if socket_path:
+        server_class, address = socketserver.ThreadingUnixStreamServer, socket_path
+    else:
+        server_class, address = ThreadingHTTPServer, (host, port)
+    server = server_class(address, RequestHandler, bind_and_activate=False)
+    server.daemon_threads = True
+    server.request_queue_size = 128  # the default of 5 drops connections under concurrent load
+    try:
+        server.server_bind()
+        server.server_activate()
+    except Exception:
+        server.server_close()
+        raise
+    return server
+
+
+class ThreadLocalOutput:
+    """Redirect output to `sys.stdout` to a per-thread buffer while a request is handled
+
+    The existing subcommands write their output to `sys.stdout`, which is shared by all threads.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = local()
+
+    def write(self, data):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(data)
+        return buffer.write(data)
+
+    def flush(self):
+        if getattr(self.local, "buffer", None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def capture(self):
+        self.local.buffer = StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+
+def thread_local_output():
+    with output_lock:
+        if not isinstance(sys.stdout, ThreadLocalOutput):
+            sys.stdout = ThreadLocalOutput(sys.stdout)
+        return sys.stdout
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        command = url.path.strip("/")
+        if command not in queries:
+            self.respond(404, f'unsupported request "{command}"\n')
+            return
+        params = parse_qs(url.query, keep_blank_values=True)
+        output = params.pop("output", ["text"])[-1]
+        try:
+            body, notfound = handle_request(command, params, output)
+        except SystemExit:
+            self.respond(400, f'invalid arguments for "{command}" request\n')
+        except (ValueError, SyntaxError, NameError) as error:
+            self.respond(400, f"{error}\n")
+        except Exception as error:
+            self.respond(500, f"{type(error).__name__}: {error}\n")
+        else:
+            self.respond(200, body, content_types[output], notfound=notfound)
+
+    def respond(self, status, body, content_type=content_types["text"], notfound=()):
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if len(notfound) > 0:
+            self.send_header("X-MicroHapDB-Not-Found", ",".join(notfound))
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self):
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"[MicroHapDB] {self.address_string()} {format % args}\n")
+
+
+def handle_request(command, params, output="text"):
+    """Run a subcommand with the specified parameters
+
+    Returns the output and a list of any `lookup` identifiers that match no records.
+    """
+    if output not in content_types:
+        raise ValueError(f'unsupported output format "{output}"')
+    notfound = list()
+    with thread_local_output().capture() as buffer:
+        args = microhapdb.cli.get_parser().parse_args(request_arguments(command, params))
+        for name in file_arguments:
+            if getattr(args, name, None) is not None:
+                option = name.replace("_", "-")
+                raise ValueError(f'reading files with "{option}" is not supported by the server')
+        if command == "lookup":
+            result, notfound = lookup.resolve(args)
+            if output == "text":
+                lookup.display(result)
+        elif output == "text":
+            microhapdb.cli.mains[command](args)
+        else:
+            result = queries[command](args)
+        text = buffer.getvalue()
+    if output == "json":
+        return result.to_json(orient="records"), notfound
+    elif output == "tsv":
+        return result.to_csv(sep="\t", index=False), notfound
+    return text, notfound
+
+
+def request_arguments(command, params):
+    """Convert request parameters to command-line arguments
+
+    >>> request_arguments("marker", {"id": ["mh01KK-117", "mh02KK-138"], "notrunc": [""]})
+    ['marker', '--notrunc', '--', 'mh01KK-117', 'mh02KK-138']
+    """
+    arguments = [command]
+    for key, values in params.items():
+        if key == "id":
+            continue
+        for value in values:
+            arguments.append(f"--{key}" if value == "" else f"--{key}={value}")
+    identifiers = params.get("id", [])
+    if len(identifiers) > 0:
+        arguments.append("--")
+        arguments.extend(identifiers)
+    return arguments
+
+
+def subparser(subparsers):
+    epilog = """\
+    Examples::
+
+        microhapdb serve --port 8000
+        curl 'http://127.0.0.1:8000/marker?id=mh01KK-117&format=fasta'
+        curl 'http://127.0.0.1:8000/frequency?marker=mh01KK-117&population=CEU&output=json'
+
+        microhapdb serve --socket /tmp/microhapdb.sock
+        curl --unix-socket /tmp/microhapdb.sock 'http://localhost/lookup?id=rs10815466'
+    """
+    epilog = dedent(epilog)
+    subparser = subparsers.add_parser(
+        "serve",
+        description="Load the database once and answer lookup, marker, population, and "
+        "frequency requests over HTTP; request paths name a subcommand and query parameters give "
+        "its arguments, e.g. /marker?region=chr18:1-25000000&ae-pop=CEU; use output=json or "
+        "output=tsv to retrieve the result table",
+        epilog=epilog,
+        formatter_class=RawDescriptionHelpFormatter,
+    )
+    subparser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="listen on the specified address; by default, 127.0.0.1",
+    )
+    subparser.add_argument(
+        "--port", type=int, default=8000, help="listen on the specified port; by default, 8000"
+    )
+    subparser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="listen on a Unix domain socket at the specified path instead of a TCP port",
+    )
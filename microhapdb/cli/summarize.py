@@ -10,24 +10,59 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
+from argparse import RawDescriptionHelpFormatter
 import microhapdb
+from microhapdb.manifest import compare_manifests, compute_manifest, read_manifest
+import sys
+from textwrap import dedent
+from warnings import warn
 
 
 def main(args):
-    num_markers = len(microhapdb.markers)
-    markers = microhapdb.Marker.objectify(microhapdb.markers)
-    num_loci = len(set([m.locus for m in markers]))
+    manifest = read_manifest()
+    if manifest is None or args.recompute:
+        observed = compute_manifest(
+            microhapdb.markers, microhapdb.populations, microhapdb.frequencies
+        )
+        if manifest is not None:
+            verify_manifest(manifest, observed)
+        manifest = observed
+    summary = manifest["summary"]
     print("[microhaplotypes]")
-    print(f"  - {num_markers} allele definitions")
-    print(f"  - {num_loci} distinct loci")
-    num_pops = len(microhapdb.populations)
-    num_haplotypes = len(microhapdb.frequencies.groupby(["Marker", "Allele"]))
-    num_frequencies = len(microhapdb.frequencies)
+    print(f"  - {summary['markers']} allele definitions")
+    print(f"  - {summary['loci']} distinct loci")
     print("[frequencies]")
-    print(f"  - {num_haplotypes} haplotypes")
-    print(f"  - {num_pops} population groups")
-    print(f"  - {num_frequencies} total microhap frequencies")
+    print(f"  - {summary['haplotypes']} haplotypes")
+    print(f"  - {summary['populations']} population groups")
+    print(f"  - {summary['frequencies']} total microhap frequencies")
+
+
+def verify_manifest(expected, observed):
+    differences = compare_manifests(expected, observed)
+    if len(differences) > 0:
+        message = f"database manifest does not match the data tables: {', '.join(differences)}"
+        warn(message, UserWarning)
+    else:
+        print("[microhapdb] database manifest matches the data tables", file=sys.stderr)
 
 
 def subparser(subparsers):
-    subparsers.add_parser("summarize", description="Summarize MicroHapDB database contents")
+    epilog = """\
+    Examples::
+
+        microhapdb summarize
+        microhapdb summarize --recompute
+    """
+    epilog = dedent(epilog)
+    subparser = subparsers.add_parser(
+        "summarize",
+        description="Summarize MicroHapDB database contents",
+        epilog=epilog,
+        formatter_class=RawDescriptionHelpFormatter,
+    )
+    subparser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="compute summary statistics from the data tables rather than reading them from the "
+        "database manifest, and verify that the manifest (if installed) matches the tables",
+    )
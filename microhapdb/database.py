@@ -0,0 +1,199 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+from functools import cached_property
+import microhapdb
+from microhapdb import tables
+import pandas as pd
+
+
+class Database:
+    """Immutable, thread-safe interface for querying MicroHapDB
+
+    A `Database` object provides marker, population, and frequency queries without reading or
+    modifying any global state other than the lazily loaded, read-only data tables it shares with
+    all other `Database` objects (see `microhapdb.tables`). The Ae values in the marker table are
+    fixed for the population specified when the object is created; by default, the population set
+    with `microhapdb.set_ae_population` at the time the marker table is first accessed. Separate
+    objects for different Ae populations can be used concurrently from multiple threads.
+
+    >>> db = Database(ae_pop="CEU")
+    >>> db.marker_table(ids=["mh17KK-014"])[["Name", "Ae"]]
+                Name     Ae
+    2592  mh17KK-014  1.842
+    >>> freqs = db.frequency_table(markers=["mh17KK-014"], populations=["SA000001B"], allele="C:C:C")
+    >>> print(freqs.to_string(index=False))
+        Marker Population Allele  Frequency  Count   Source
+    mh17KK-014  SA000001B  C:C:C       0.99     94 Kidd2018
+    """
+
+    def __init__(self, ae_pop=None):
+        object.__setattr__(self, "ae_pop", ae_pop)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} objects are immutable")
+
+    def __getattr__(self, name):
+        if name in tables.loaders:
+            return getattr(tables, name)
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @cached_property
+    def markers(self):
+        if self.ae_pop is None:
+            return microhapdb.markers
+        return tables.join_aes(tables.markers, popid=self.ae_pop)
+
+    def with_ae_population(self, popid):
+        """Create a new database with Ae values for the specified population"""
+        return Database(ae_pop=popid)
+
+    def marker_ids(self, identifiers):
+        """Resolve marker names, locus names, and rsIDs to canonical marker names"""
+        index = self.markerindex
+        ids = set()
+        for ident in identifiers:
+            ids.update(index.get(ident, ()))
+        return sorted(ids)
+
+    def population_ids(self, identifiers):
+        """Resolve population IDs and names to canonical population IDs"""
+        index = self.populationindex
+        ids = set()
+        for ident in identifiers:
+            ids.update(index.get(ident, ()))
+        return sorted(ids)
+
+    def lookup(self, identifiers):
+        """Resolve any number of marker and population identifiers in a single pass
+
+        Each identifier is resolved as a population ID or name if possible, and otherwise as a
+        marker name, locus name, or rsID. Returns a table of all matching records, with the
+        identifier that matched each record in the "Input" column, and a list of the identifiers
+        that did not match any record.
+
+        >>> table, notfound = Database().lookup(["rs10815466", "Asia", "FakeIdentifier"])
+        >>> table[["Input", "Name", "ID"]]
+                   Input           Name                ID
+        1560  rs10815466  mh09KK-033.v1               NaN
+        1561  rs10815466  mh09KK-033.v2               NaN
+        8           Asia           Asia  MHDBP-936bc36f79
+        >>> notfound
+        ['FakeIdentifier']
+        """
+        popindex, markerindex = self.populationindex, self.markerindex
+        pophits, markerhits, notfound = list(), list(), list()
+        for ident in identifiers:
+            if ident in popindex:
+                pophits.append((ident, popindex[ident]))
+            elif ident in markerindex:
+                markerhits.append((ident, markerindex[ident]))
+            else:
+                notfound.append(ident)
+        parts = [
+            select_records(self.markers, self.markers.Name, markerhits),
+            select_records(self.populations, self.populations.ID, pophits),
+        ]
+        parts = [part for part in parts if part is not None]
+        if len(parts) == 0:
+            return pd.DataFrame(columns=["Input"]), notfound
+        if len(parts) > 1:
+            parts = [part.convert_dtypes(convert_string=False) for part in parts]
+        return pd.concat(parts), notfound
+
+    def search(self, text, limit=10, fuzzy=False):
+        """Search for marker and population records by partial name or identifier
+
+        Marker names, locus names, rsIDs, population IDs, and population names are matched against
+        `text` with `microhapdb.searchindex` and ranked: exact matches first, then prefix matches,
+        then substring matches, then (with `fuzzy=True`) approximate matches. Returns the records
+        of the top `limit` matching identifiers in rank order, with the matching identifier in the
+        "Match" column.
+
+        >>> Database().search("japan")[["Input", "Match", "ID"]]
+            Input                     Match                ID
+        53  japan                  Japanese  MHDBP-63967b883e
+        54  japan                  Japanese         SA000010B
+        55  japan  Japanese in Tokyo, Japan               JPT
+        """
+        matches = self.searchindex.search(text, limit=limit, fuzzy=fuzzy)
+        table, notfound = self.lookup(matches.Term)
+        rank = {term: n for n, term in enumerate(matches.Term)}
+        table = table.rename(columns={"Input": "Match"})
+        table = table.iloc[table.Match.map(rank).to_numpy().argsort(kind="stable")]
+        table.insert(0, "Input", text)
+        return table
+
+    def suggest(self, text, limit=10):
+        """Suggest up to `limit` marker and population identifiers beginning with `text`
+
+        >>> Database().suggest("rs108154")
+        ['rs10815466']
+        """
+        return self.searchindex.suggest(text, limit=limit)
+
+    def marker_table(self, ids=None, region=None, regions=None, query=None):
+        """Retrieve markers matching all of the specified criteria
+
+        Markers can be selected by identifier, by a region string (see
+        `microhapdb.Marker.parse_regionstr`) or a list of regions, and by a Pandas-style query.
+        """
+        table = self.markers
+        if region is not None:
+            chrom, start, end = microhapdb.Marker.parse_regionstr(region)
+            table = table.loc[self.regionindex.query(chrom, start, end)]
+        elif regions is not None:
+            regions = [
+                microhapdb.Marker.parse_regionstr(region) if isinstance(region, str) else region
+                for region in regions
+            ]
+            table = table.loc[self.regionindex.query_many(regions)]
+        if query is not None:
+            table = table.query(query, engine="python")
+        if ids is not None:
+            table = table[table.Name.isin(self.marker_ids(ids))]
+        return table
+
+    def population_table(self, ids=None, query=None):
+        """Retrieve populations matching all of the specified criteria"""
+        table = self.populations
+        if query is not None:
+            table = table.query(query, engine="python")
+        if ids is not None:
+            table = table[table.ID.isin(self.population_ids(ids))]
+        return table
+
+    def frequency_table(self, markers=None, populations=None, allele=None):
+        """Retrieve haplotype frequencies matching all of the specified criteria"""
+        table = self.frequencies
+        if markers is not None:
+            table = table[table.Marker.isin(self.marker_ids(markers))]
+        if populations is not None:
+            table = table[table.Population.isin(self.population_ids(populations))]
+        if allele is not None:
+            table = table[table.Allele == allele]
+        return table
+
+
+def select_records(table, keys, hits):
+    """Select the records matching each identifier, in table order, labeled with the identifier"""
+    if len(hits) == 0:
+        return None
+    keys = pd.Index(keys)
+    inputs, positions = list(), list()
+    for ident, matches in hits:
+        matchpositions = sorted(keys.get_indexer(matches))
+        inputs.extend([ident] * len(matchpositions))
+        positions.extend(matchpositions)
+    records = table.iloc[positions]
+    return records.assign(Input=inputs)[["Input", *table.columns]]
@@ -0,0 +1,147 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+"""Summary statistics of the database contents, precomputed by the database build
+
+The manifest records the number of marker definitions, loci, populations, haplotypes, and
+frequencies in the database, the same statistics broken down by data source and by population,
+and a SHA-256 checksum of each data table. It is written as JSON alongside the data tables, so
+that the database can be summarized without loading any tables.
+"""
+
+from collections import defaultdict
+from hashlib import sha256
+from importlib.resources import files
+import json
+import pandas as pd
+from pathlib import Path
+
+
+MANIFEST_FILE = "manifest.json"
+TABLE_FILES = (
+    "marker.csv",
+    "marker-aes.csv",
+    "population.csv",
+    "frequency.csv.gz",
+    "indels.csv",
+    "merged.csv",
+)
+
+
+def compute_manifest(markers, populations, frequencies, directory=None):
+    """Compute summary statistics for the marker, population, and frequency tables
+
+    Checksums are computed for the data tables in `directory`, by default the installed data
+    directory.
+    """
+    loci = markers.Name.str.split(".").str[0]
+    haplotypes = frequencies.groupby(["Marker", "Allele"], observed=True).ngroups
+    summary = {
+        "markers": len(markers),
+        "loci": int(loci.nunique()),
+        "populations": len(populations),
+        "haplotypes": int(haplotypes),
+        "frequencies": len(frequencies),
+    }
+    checksums = table_checksums(directory)
+    return {
+        "summary": summary,
+        "sources": source_stats(markers, loci, populations, frequencies),
+        "populations": population_stats(frequencies),
+        "checksums": checksums,
+        "checksum": combined_checksum(checksums),
+    }
+
+
+def source_stats(markers, loci, populations, frequencies):
+    """Count marker definitions, loci, populations, and frequencies by data source
+
+    Markers reported by multiple sources (e.g. "Kidd2018;Turchi2019") are counted for each source.
+    """
+    stats = defaultdict(lambda: dict(markers=0, loci=0, populations=0, frequencies=0))
+    table = pd.DataFrame(
+        {"Source": markers.Source.str.split(";").to_numpy(), "Locus": loci.to_numpy()}
+    )
+    counts = table.explode("Source").groupby("Source").Locus.agg(["size", "nunique"])
+    for source, nmarkers, nloci in counts.itertuples():
+        stats[source]["markers"] = int(nmarkers)
+        stats[source]["loci"] = int(nloci)
+    for source, count in populations.Source.value_counts().items():
+        stats[source]["populations"] = int(count)
+    for source, count in frequencies.groupby("Source", observed=True).size().items():
+        stats[source]["frequencies"] = int(count)
+    return {source: stats[source] for source in sorted(stats)}
+
+
+def population_stats(frequencies):
+    """Count markers, haplotypes, and frequencies with data for each population"""
+    groups = frequencies.groupby("Population", observed=True)
+    markers = groups.Marker.nunique()
+    counts = groups.size()
+    return {
+        str(popid): {"markers": int(markers[popid]), "frequencies": int(counts[popid])}
+        for popid in sorted(counts.index)
+    }
+
+
+def table_checksums(directory=None):
+    """Compute the SHA-256 checksum of each data table present in the specified directory"""
+    directory = files("microhapdb") / "data" if directory is None else Path(directory)
+    checksums = dict()
+    for filename in TABLE_FILES:
+        path = directory / filename
+        if path.is_file():
+            checksums[filename] = sha256(path.read_bytes()).hexdigest()
+    return checksums
+
+
+def combined_checksum(checksums):
+    """Compute a single checksum of the database contents from the checksums of all tables
+
+    >>> combined_checksum({"marker.csv": "abc", "population.csv": "def"})[:16]
+    '2bb89a6da611bf06'
+    """
+    digest = sha256()
+    for filename in sorted(checksums):
+        digest.update(f"{filename}\t{checksums[filename]}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_manifest(manifest, path):
+    with open(path, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+        print(file=fh)
+
+
+def read_manifest(path=None):
+    """Read the database manifest, or return `None` if the manifest is not installed"""
+    path = files("microhapdb") / "data" / MANIFEST_FILE if path is None else Path(path)
+    if not path.is_file():
+        return None
+    with open(path, "r") as fh:
+        return json.load(fh)
+
+
+def compare_manifests(expected, observed):
+    """List the summary statistics and checksums that differ between two manifests
+
+    >>> compare_manifests({"summary": {"loci": 2}}, {"summary": {"loci": 3}})
+    ['summary.loci']
+    """
+    differences = list()
+    for section in ("summary", "sources", "populations", "checksums"):
+        values1, values2 = expected.get(section, {}), observed.get(section, {})
+        for key in sorted(set(values1) | set(values2)):
+            if values1.get(key) != values2.get(key):
+                differences.append(f"{section}.{key}")
+    return differences
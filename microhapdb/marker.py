@@ -10,10 +10,70 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
+from functools import cached_property
 from io import StringIO
 from math import ceil
 import microhapdb
 import pandas as pd
+from typing import NamedTuple
+
+
+class MarkerRecord(NamedTuple):
+    """Compact, immutable copy of one row of the marker table
+
+    The marker's variant positions are parsed once, when the record is created, into sorted tuples
+    of 0-based GRCh38 and GRCh37 offsets. Like a row of the table, fields can be accessed by name
+    with either attribute or item syntax.
+
+    >>> record = next(MarkerRecord.from_table(Marker.table_from_ids(["mh17KK-014"])))
+    >>> record.Name, record["Chrom"], record.Offsets
+    ('mh17KK-014', 'chr17', (4497060, 4497088, 4497096))
+    """
+
+    Name: str
+    NumVars: int
+    Extent: int
+    Chrom: str
+    Start: int
+    End: int
+    Positions: str
+    Positions37: str
+    RSIDs: str
+    Source: str
+    Ae: float = None
+    Offsets: tuple = ()
+    Offsets37: tuple = ()
+
+    @classmethod
+    def from_table(cls, table):
+        if "Ae" not in table.columns:
+            table = table.assign(Ae=None)
+        columns = list(cls._fields[:-2])
+        for values in table[columns].itertuples(index=False, name=None):
+            yield cls(*values, parse_positions(values[6]), parse_positions(values[7]))
+
+    @classmethod
+    def from_row(cls, row):
+        values = [row[column] for column in cls._fields[:-3]]
+        ae = row["Ae"] if "Ae" in row else None
+        offsets = parse_positions(row["Positions"]), parse_positions(row["Positions37"])
+        return cls(*values, ae, *offsets)
+
+    def __getitem__(self, key):
+        if not isinstance(key, str):
+            return tuple.__getitem__(self, key)
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+
+def parse_positions(positions):
+    """Convert a semicolon-separated list of 1-based positions to sorted 0-based offsets
+
+    >>> parse_positions("4497097;4497061;4497089")
+    (4497060, 4497088, 4497096)
+    """
+    return tuple(sorted(int(position) - 1 for position in positions.split(";")))
 
 
 class Marker:
@@ -46,67 +106,89 @@ class Marker:
     """
 
     def __init__(self, marker, delta=10, minlen=80, extendmode=0):
+        if not isinstance(marker, MarkerRecord):
+            marker = MarkerRecord.from_row(marker)
         self.extendmode = int(extendmode)
         self.data = marker
         self.delta = delta
         self.minlen = minlen
 
     @staticmethod
-    def table_from_ids(identifiers):
-        ids = Marker.standardize_ids(identifiers)
-        table = microhapdb.markers[microhapdb.markers.Name.isin(ids)]
-        return table
+    def table_from_ids(identifiers, ae_pop=None):
+        return microhapdb.Database(ae_pop=ae_pop).marker_table(ids=identifiers)
 
     @staticmethod
-    def table_from_query(query):
-        table = microhapdb.markers.query(query, engine="python")
-        return table
+    def table_from_query(query, ae_pop=None):
+        return microhapdb.Database(ae_pop=ae_pop).marker_table(query=query)
+
+    @staticmethod
+    def join_aes(table, ae_pop=None):
+        """Replace the Ae values in a marker table with those of the specified population
+
+        The table is returned unchanged if no population is specified. This allows Ae values to be
+        selected on a per-call basis, rather than for the entire process with
+        `microhapdb.set_ae_population`.
+
+        >>> table = Marker.table_from_ids(["mh17KK-014"])
+        >>> table.Ae.tolist(), Marker.join_aes(table, "CEU").Ae.tolist()
+        ([2.074], [1.842])
+        """
+        if ae_pop is None:
+            return table
+        return microhapdb.tables.join_aes(table, popid=ae_pop)
 
     @staticmethod
     def definitions_from_ids(identifiers, **kwargs):
         return pd.concat([marker.definition for marker in Marker.from_ids(identifiers, **kwargs)])
 
     @staticmethod
-    def table_from_region(regionstr):
-        markers = microhapdb.markers.copy()
-        chrom, start, end = Marker.parse_regionstr(regionstr)
-        query = f'Chrom == "{chrom}"'
-        if start is not None:
-            query += f" and (Start < {end}"
-            query += f" and End > {start})"
-        result = markers.query(query)
-        return result
+    def table_from_region(regionstr, ae_pop=None):
+        return microhapdb.Database(ae_pop=ae_pop).marker_table(region=regionstr)
+
+    @staticmethod
+    def table_from_regions(regions, ae_pop=None):
+        """Retrieve all markers overlapping any of the specified regions
+
+        Regions can be specified as region strings (see `parse_regionstr`) or as
+        `(chrom, start, end)` tuples.
+
+        >>> Marker.table_from_regions(["chr1:1-50000", ("chr2", 600000, 700000)]).Name.tolist()
+        ['mh01LW-3', 'mh02WL-080']
+        """
+        return microhapdb.Database(ae_pop=ae_pop).marker_table(regions=regions)
 
     @classmethod
-    def from_id(cls, identifier, **kwargs):
-        markerids = cls.standardize_ids([identifier])
-        if len(markerids) < 1:
+    def from_id(cls, identifier, ae_pop=None, **kwargs):
+        result = cls.table_from_ids([identifier], ae_pop=ae_pop)
+        if len(result) < 1:
             raise ValueError(f"no such marker '{identifier}'")
-        result = microhapdb.markers[microhapdb.markers.Name.isin(markerids)]
         assert len(result) == 1, identifier
-        marker = result.iloc[0]
-        return cls(marker, **kwargs)
+        return next(cls.objectify(result, **kwargs))
 
     @classmethod
-    def from_ids(cls, identifiers, **kwargs):
-        table = cls.table_from_ids(identifiers)
+    def from_ids(cls, identifiers, ae_pop=None, **kwargs):
+        table = cls.table_from_ids(identifiers, ae_pop=ae_pop)
         yield from cls.objectify(table, **kwargs)
 
     @classmethod
-    def from_query(cls, query, **kwargs):
-        table = cls.table_from_query(query)
+    def from_query(cls, query, ae_pop=None, **kwargs):
+        table = cls.table_from_query(query, ae_pop=ae_pop)
         yield from cls.objectify(table, **kwargs)
 
     @classmethod
-    def from_region(cls, region, **kwargs):
-        table = cls.table_from_region(region)
+    def from_region(cls, region, ae_pop=None, **kwargs):
+        table = cls.table_from_region(region, ae_pop=ae_pop)
+        yield from cls.objectify(table, **kwargs)
+
+    @classmethod
+    def from_regions(cls, regions, ae_pop=None, **kwargs):
+        table = cls.table_from_regions(regions, ae_pop=ae_pop)
         yield from cls.objectify(table, **kwargs)
 
     @classmethod
     def objectify(cls, table, **kwargs):
-        for i, row in table.iterrows():
-            marker = cls(row, **kwargs)
-            yield marker
+        for record in MarkerRecord.from_table(table):
+            yield cls(record, **kwargs)
 
     @staticmethod
     def parse_regionstr(regionstr):
@@ -133,25 +215,12 @@ class Marker:
 
     @staticmethod
     def standardize_ids(idents):
-        def id_in_series(ident, series):
-            return ident in series.values
-
-        ids = set()
-        for ident in idents:
-            locusnames = microhapdb.markers.Name.apply(lambda x: x.split(".")[0])
-            if id_in_series(ident, microhapdb.variantmap.Variant):
-                result = microhapdb.variantmap[microhapdb.variantmap.Variant == ident]
-                ids.update(result.Marker)
-            elif id_in_series(ident, microhapdb.markers.Name) or id_in_series(ident, locusnames):
-                result = microhapdb.markers[microhapdb.markers.Name.str.contains(ident)]
-                ids.update(result.Name)
-            elif id_in_series(ident, microhapdb.merged.Derivative):
-                result = microhapdb.merged[microhapdb.merged.Derivative.str.contains(ident)]
-                assert len(result) == 1
-                original = result.Original.iloc[0]
-                result = microhapdb.markers[microhapdb.markers.Name.str.contains(original)]
-                ids.update(result.Name)
-        return sorted(microhapdb.markers[microhapdb.markers.Name.isin(ids)].Name)
+        """Resolve marker names, locus names, and rsIDs to canonical marker names
+
+        >>> Marker.standardize_ids(["mh01KK-205", "rs4697751", "FakeIdentifier"])
+        ['mh01KK-205.v1', 'mh01KK-205.v2', 'mh01KK-205.v3', 'mh01KK-205.v4', 'mh01KK-205.v5', 'mh04CP-007']
+        """
+        return microhapdb.Database().marker_ids(idents)
 
     def __str__(self):
         return f"{self.name} ({self.slug})"
@@ -223,15 +292,15 @@ class Marker:
                 end += extension
         return start, end
 
-    @property
+    @cached_property
     def variant_lengths(self):
         nvars = len(self.offsets)
         lengths = [1] * nvars
-        for n, row in microhapdb.indels[microhapdb.indels.Marker == self.name].iterrows():
-            assert row.VariantIndex < nvars, (row.VariantIndex, nvars)
-            varalleles = [row.Refr] + row.Alt.split(",")
+        for varindex, refr, alt in microhapdb.indelindex.get(self.name, []):
+            assert varindex < nvars, (varindex, nvars)
+            varalleles = [refr] + alt.split(",")
             varallelelengths = [len(va) for va in varalleles]
-            lengths[row.VariantIndex] = max(varallelelengths)
+            lengths[varindex] = max(varallelelengths)
         return lengths
 
     @property
@@ -369,24 +438,22 @@ class Marker:
         start, end = self.target_interval
         return [o - start for o in self.offsets]
 
-    @property
+    @cached_property
     def offsets(self):
-        return sorted([int(p) - 1 for p in self.data.Positions.split(";")])
+        return list(self.data.Offsets)
 
-    @property
+    @cached_property
     def offsets37(self):
-        return sorted([int(p) - 1 for p in self.data.Positions37.split(";")])
+        return list(self.data.Offsets37)
 
     @property
     def marker_seq(self):
-        start = self.start
-        end = self.end
-        return str(microhapdb.hg38[self.chrom][start:end])
+        return microhapdb.sequences.fetch(self.chrom, self.start, self.end)
 
     @property
     def target_seq(self):
         start, end = self.target_interval
-        return str(microhapdb.hg38[self.chrom][start:end])
+        return microhapdb.sequences.fetch(self.chrom, start, end)
 
     @property
     def flank_seqs(self):
@@ -397,23 +464,21 @@ class Marker:
         right = markerseq[last_snp_idx:]
         return left, right
 
-    @property
+    @cached_property
     def reference_lengths(self):
         lengths = list()
-        ind = microhapdb.indels
+        indels = microhapdb.indelindex.get(self.name, [])
         for n in range(self.nvar):
             refrlength = 1
-            result = ind[(ind.Marker == self.name) & (ind.VariantIndex == n)]
+            result = [refr for varindex, refr, alt in indels if varindex == n]
             if len(result) == 1:
-                refrlength = len(result.Refr.iloc[0])
+                refrlength = len(result[0])
             lengths.append(refrlength)
         return lengths
 
-    @property
+    @cached_property
     def alleles(self):
-        return sorted(
-            microhapdb.frequencies[microhapdb.frequencies.Marker == self.name].Allele.unique()
-        )
+        return list(microhapdb.alleleindex.get(self.name, ()))
 
     @property
     def defline(self):
@@ -502,7 +567,7 @@ class Locus:
     @property
     def target_seq(self):
         start, end = self.target_interval
-        return str(microhapdb.hg38[self.chrom][start:end])
+        return microhapdb.sequences.fetch(self.chrom, start, end)
 
     @property
     def name(self):
@@ -40,14 +40,11 @@ class Population:
 
     @staticmethod
     def table_from_ids(identifiers):
-        ids = Population.standardize_ids(identifiers)
-        table = microhapdb.populations[microhapdb.populations.ID.isin(ids)]
-        return table
+        return microhapdb.Database().population_table(ids=identifiers)
 
     @staticmethod
     def table_from_query(query):
-        table = microhapdb.populations.query(query, engine="python")
-        return table
+        return microhapdb.Database().population_table(query=query)
 
     @classmethod
     def from_id(cls, identifier):
@@ -70,17 +67,12 @@ class Population:
 
     @classmethod
     def objectify(cls, table):
-        for i, row in table.iterrows():
-            population = cls(row.ID, row.Name, row.Source)
-            yield population
+        for popid, name, source in zip(table.ID, table.Name, table.Source):
+            yield cls(popid, name, source)
 
     @staticmethod
     def standardize_ids(identifiers):
-        ids = set(identifiers)
-        result = microhapdb.populations[
-            (microhapdb.populations.ID.isin(ids)) | (microhapdb.populations.Name.isin(ids))
-        ]
-        return sorted(result.ID)
+        return microhapdb.Database().population_ids(identifiers)
 
     def __str__(self):
         return "\t".join((self.popid, self.name, self.source))
@@ -88,7 +80,7 @@ class Population:
     @property
     def detail(self):
         result = microhapdb.frequencies[microhapdb.frequencies.Population == self.popid]
-        markers_with_n_alleles = Counter(result.groupby("Marker").size())
+        markers_with_n_alleles = Counter(result.groupby("Marker", observed=True).size())
         output = StringIO()
         print(
             "--------------------------------------------------------------[ MicroHapDB ]----",
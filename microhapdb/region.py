@@ -0,0 +1,84 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+import numpy as np
+
+
+class RegionIndex:
+    """Index of marker extents for fast genomic region queries
+
+    Markers are grouped by chromosome and sorted by start coordinate. Since marker extents are
+    short, the markers overlapping a query interval can be found by binary search over the sorted
+    start coordinates, bounded by the longest marker extent on the chromosome.
+
+    >>> import microhapdb
+    >>> index = RegionIndex(microhapdb.markers)
+    >>> labels = index.query("chr12", 100000000, 200000000)
+    >>> len(labels)
+    42
+    >>> labels = index.query_many([("chrX", None, None), ("chr12", 100000000, 200000000)])
+    >>> len(labels)
+    53
+    """
+
+    def __init__(self, markers):
+        self.chroms = dict()
+        for chrom, table in markers.groupby("Chrom", sort=False):
+            table = table.sort_values("Start", kind="stable")
+            starts = table.Start.to_numpy()
+            ends = table.End.to_numpy()
+            labels = table.index.to_numpy()
+            maxextent = int((ends - starts).max())
+            self.chroms[chrom] = (starts, ends, labels, maxextent)
+
+    def query(self, chrom, start=None, end=None):
+        """Retrieve the table index labels of all markers overlapping the specified region
+
+        Consistent with `Marker.table_from_region`, a marker overlaps the region if it starts
+        before `end` and ends after `start`. If no coordinates are provided, all markers on the
+        chromosome are reported. Labels are returned in sorted order.
+        """
+        if chrom not in self.chroms:
+            return np.array([], dtype=np.int64)
+        starts, ends, labels, maxextent = self.chroms[chrom]
+        if start is None:
+            return np.sort(labels)
+        lower = np.searchsorted(starts, start - maxextent, side="right")
+        upper = np.searchsorted(starts, end, side="left")
+        hits = labels[lower:upper][ends[lower:upper] > start]
+        return np.sort(hits)
+
+    def query_many(self, regions):
+        """Retrieve the index labels of all markers overlapping any of the specified regions
+
+        Each region is a `(chrom, start, end)` tuple, with `start` and `end` optionally `None` to
+        select the entire chromosome. Regions are grouped by chromosome and resolved with a
+        single vectorized binary search per chromosome.
+        """
+        by_chrom = dict()
+        for chrom, start, end in regions:
+            by_chrom.setdefault(chrom, list()).append((start, end))
+        hits = [np.array([], dtype=np.int64)]
+        for chrom, intervals in by_chrom.items():
+            if chrom not in self.chroms:
+                continue
+            starts, ends, labels, maxextent = self.chroms[chrom]
+            if any(start is None for start, end in intervals):
+                hits.append(labels)
+                continue
+            qstarts = np.array([start for start, end in intervals])
+            qends = np.array([end for start, end in intervals])
+            lowers = np.searchsorted(starts, qstarts - maxextent, side="right")
+            uppers = np.searchsorted(starts, qends, side="left")
+            for qstart, lower, upper in zip(qstarts, lowers, uppers):
+                hits.append(labels[lower:upper][ends[lower:upper] > qstart])
+        return np.unique(np.concatenate(hits))
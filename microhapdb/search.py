@@ -0,0 +1,166 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+
+TIERS = ("exact", "prefix", "substring", "similar")
+
+
+class SearchIndex:
+    """Index of marker and population identifiers for prefix, substring, and approximate search
+
+    Search terms are compared case-insensitively. Prefix searches use binary search over the
+    sorted terms. Substring searches intersect the posting lists of the n-grams of the query: the
+    index stores postings for every 1- and 2-gram, so one- and two-character queries are resolved
+    directly, and candidates for longer queries are verified after intersecting trigram postings.
+    Approximate searches rank candidates by trigram similarity, as in PostgreSQL's `pg_trgm`.
+
+    >>> index = SearchIndex({"Japanese": "population", "mh17KK-014": "marker"})
+    >>> index.suggest("ja")
+    ['Japanese']
+    >>> index.search("KK-01")[["Term", "Match"]]
+             Term      Match
+    0  mh17KK-014  substring
+    >>> index.search("japanse", fuzzy=True)[["Term", "Match", "Similarity"]]
+           Term    Match  Similarity
+    0  Japanese  similar       0.545
+    """
+
+    def __init__(self, terms):
+        terms = sorted(terms.items(), key=lambda item: (item[0].casefold(), item[0]))
+        self.terms = [term for term, kind in terms]
+        self.kinds = [kind for term, kind in terms]
+        self.keys = [term.casefold() for term in self.terms]
+        postings = dict()
+        numtrigrams = list()
+        for n, key in enumerate(self.keys):
+            grams = ngrams(key, 1) | ngrams(key, 2)
+            trigrams = padded_trigrams(key)
+            numtrigrams.append(len(trigrams))
+            for gram in grams | trigrams:
+                postings.setdefault(gram, list()).append(n)
+        self.postings = {gram: np.array(hits, dtype=np.int32) for gram, hits in postings.items()}
+        self.numtrigrams = np.array(numtrigrams, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def suggest(self, text, limit=10):
+        """Suggest up to `limit` terms beginning with `text`, in sorted order
+
+        This is a single binary search plus a slice of the sorted terms, intended for type-ahead
+        completion.
+        """
+        hits = list()
+        text = text.casefold()
+        for n in range(bisect_left(self.keys, text), len(self.keys)):
+            if len(hits) >= limit or not self.keys[n].startswith(text):
+                break
+            hits.append(self.terms[n])
+        return hits
+
+    def prefix(self, text):
+        """Retrieve the positions of all terms beginning with `text`"""
+        text = text.casefold()
+        lower = bisect_left(self.keys, text)
+        upper = bisect_left(self.keys, text + "\U0010ffff", lo=lower)
+        return np.arange(lower, upper, dtype=np.int32)
+
+    def substring(self, text):
+        """Retrieve the positions of all terms containing `text`"""
+        text = text.casefold()
+        if len(text) == 0:
+            return np.arange(len(self.keys), dtype=np.int32)
+        if len(text) < 3:
+            return self.postings.get(text, np.array([], dtype=np.int32))
+        candidates = None
+        for gram in ngrams(text, 3):
+            if gram not in self.postings:
+                return np.array([], dtype=np.int32)
+            hits = self.postings[gram]
+            candidates = hits if candidates is None else np.intersect1d(candidates, hits, True)
+        return np.array([n for n in candidates if text in self.keys[n]], dtype=np.int32)
+
+    def similar(self, text, threshold=0.3):
+        """Retrieve the positions and similarity scores of all terms similar to `text`
+
+        Similarity is the number of trigrams shared by the query and the term, divided by the
+        number of distinct trigrams in either. Terms with a similarity below `threshold` are not
+        reported.
+        """
+        trigrams = [gram for gram in padded_trigrams(text.casefold()) if gram in self.postings]
+        if len(trigrams) == 0:
+            return np.array([], dtype=np.int32), np.array([])
+        hits = np.concatenate([self.postings[gram] for gram in trigrams])
+        positions, shared = np.unique(hits, return_counts=True)
+        total = len(padded_trigrams(text.casefold())) + self.numtrigrams[positions] - shared
+        scores = shared / total
+        keep = scores >= threshold
+        return positions[keep], scores[keep]
+
+    def search(self, text, limit=10, fuzzy=False, threshold=0.3):
+        """Search for terms matching `text` and rank them
+
+        Exact matches are ranked first, followed by prefix matches and substring matches. With
+        `fuzzy=True`, terms that do not contain the query but have a trigram similarity of at least
+        `threshold` are also reported. Within each tier, terms are ranked by trigram similarity to
+        the query. Returns a table of the top `limit` terms with their type ("marker" or
+        "population"), match tier, and similarity score.
+        """
+        key = text.casefold()
+        tiers = dict()
+        for n in self.substring(key):
+            if self.keys[n] == key:
+                tiers[n] = 0
+            elif self.keys[n].startswith(key):
+                tiers[n] = 1
+            else:
+                tiers[n] = 2
+        positions, scores = self.similar(key, threshold=0.0)
+        similarity = dict(zip(positions.tolist(), scores.tolist()))
+        if fuzzy:
+            for n in positions[scores >= threshold].tolist():
+                tiers.setdefault(n, 3)
+        ranked = sorted(tiers, key=lambda n: (tiers[n], -similarity.get(n, 0.0), self.keys[n]))
+        ranked = ranked[:limit]
+        return pd.DataFrame(
+            {
+                "Term": [self.terms[n] for n in ranked],
+                "Type": [self.kinds[n] for n in ranked],
+                "Match": [TIERS[tiers[n]] for n in ranked],
+                "Similarity": [round(similarity.get(n, 0.0), 3) for n in ranked],
+            }
+        )
+
+
+def ngrams(text, n):
+    """Compute the set of all substrings of length `n`
+
+    >>> sorted(ngrams("abcd", 3))
+    ['abc', 'bcd']
+    """
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
+
+
+def padded_trigrams(text):
+    """Compute the set of trigrams of a string padded with two leading and one trailing space
+
+    Padding gives extra weight to the beginning of the string, so that terms sharing a prefix with
+    the query score higher than terms sharing an internal substring.
+
+    >>> sorted(padded_trigrams("abc"))
+    ['  a', ' ab', 'abc', 'bc ']
+    """
+    return ngrams(f"  {text} ", 3)
@@ -0,0 +1,346 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+from bisect import bisect_right
+from collections import OrderedDict
+from contextlib import contextmanager
+import json
+import numpy as np
+from threading import RLock
+
+
+def merge_intervals(intervals, distance=0):
+    """Sort `(chrom, start, end)` intervals and merge those within `distance` bp of each other
+
+    >>> merge_intervals([("chr2", 5, 9), ("chr1", 10, 20), ("chr1", 0, 12), ("chr1", 25, 30)])
+    [['chr1', 0, 20], ['chr1', 25, 30], ['chr2', 5, 9]]
+    >>> merge_intervals([("chr1", 10, 20), ("chr1", 0, 12), ("chr1", 25, 30)], distance=5)
+    [['chr1', 0, 30]]
+    """
+    merged = list()
+    for chrom, start, end in sorted(intervals):
+        if merged and merged[-1][0] == chrom and start <= merged[-1][2] + distance:
+            merged[-1][2] = max(merged[-1][2], end)
+        else:
+            merged.append([chrom, start, end])
+    return merged
+
+
+class SequenceExtractor:
+    """Extract reference sequences with batched reads and optional caching
+
+    Individual sequences are sliced from the reference with `fetch`. Before extracting many
+    sequences, `prefetch` (or the `prefetched` context manager) sorts the requested intervals by
+    chromosome and position and merges intervals within `merge_distance` bp of each other, so that
+    each cluster of intervals is loaded with a single read. Sequences for intervals not prefetched
+    are read directly from the reference, or via an LRU cache of `cache_size` windows of
+    `window_size` bp when `cache_size` is positive.
+
+    The reference can be any object supporting `reference[chrom][start:end]`, such as a
+    `pyfaidx.Fasta` object. References that store only some regions of the genome, such as a
+    `PackedGenome` built from marker context, report the bounds of each stored region with an
+    `extent(chrom, position)` method; cached windows and merged reads are then clipped to these
+    bounds, and sequences outside of them are read from the `fallback` reference, if provided.
+    Extractors can be shared between threads, although prefetched blocks are shared as
+    well and cleared by whichever thread finishes first.
+    """
+
+    def __init__(
+        self, reference, merge_distance=1000, cache_size=0, window_size=65536, fallback=None
+    ):
+        self.reference = reference
+        self.fallback = fallback
+        self.merge_distance = merge_distance
+        self.cache_size = cache_size
+        self.window_size = window_size
+        self.blocks = dict()
+        self.cache = OrderedDict()
+        self.num_reads = 0
+        self.lock = RLock()
+
+    def read(self, chrom, start, end):
+        reference = self.reference
+        if self.fallback is not None:
+            bounds = self.extent(chrom, start)
+            if bounds is None or end > bounds[1]:
+                reference = self.fallback
+        if reference is None:
+            raise FileNotFoundError(
+                "GRCh38 reference genome not found; run `microhapdb --download` to install it"
+            )
+        self.num_reads += 1
+        return str(reference[chrom][start:end])
+
+    def fetch(self, chrom, start, end):
+        """Retrieve the reference sequence of the interval [start, end) on `chrom`"""
+        sequence = self.fetch_prefetched(chrom, start, end)
+        if sequence is not None:
+            return sequence
+        if self.cache_size > 0:
+            return self.fetch_cached(chrom, start, end)
+        return self.read(chrom, start, end)
+
+    def fetch_many(self, intervals):
+        """Retrieve sequences for a list of `(chrom, start, end)` intervals, in input order"""
+        intervals = list(intervals)
+        with self.prefetched(intervals):
+            return [self.fetch(*interval) for interval in intervals]
+
+    def prefetch(self, intervals):
+        """Load sorted, coalesced blocks covering all of the specified intervals into memory"""
+        blocks = {chrom: list(chromblocks) for chrom, chromblocks in self.blocks.items()}
+        for chrom, start, end in self.coalesce(intervals):
+            sequence = self.read(chrom, start, end)
+            blocks.setdefault(chrom, list()).append((start, end, sequence))
+        for chrom in blocks:
+            blocks[chrom].sort()
+        self.blocks = blocks
+
+    def coalesce(self, intervals):
+        """Merge intervals within `merge_distance` bp of each other in the same reference extent"""
+        groups = dict()
+        for chrom, start, end in intervals:
+            groups.setdefault(self.extent(chrom, start), list()).append((chrom, start, end))
+        merged = list()
+        for group in groups.values():
+            merged.extend(merge_intervals(group, distance=self.merge_distance))
+        return sorted(merged)
+
+    def extent(self, chrom, position):
+        """Bounds of the region of the reference containing `position`, or `None` if not stored"""
+        if not hasattr(self.reference, "extent"):
+            return 0, float("Inf")
+        return self.reference.extent(chrom, position)
+
+    def clear(self):
+        """Discard all prefetched blocks"""
+        self.blocks = dict()
+
+    @contextmanager
+    def prefetched(self, intervals):
+        self.prefetch(intervals)
+        try:
+            yield self
+        finally:
+            self.clear()
+
+    def fetch_prefetched(self, chrom, start, end):
+        blocks = self.blocks.get(chrom)
+        if not blocks:
+            return None
+        i = bisect_right(blocks, (start, float("Inf"))) - 1
+        if i < 0:
+            return None
+        blockstart, blockend, sequence = blocks[i]
+        if end > blockend:
+            return None
+        return sequence[start - blockstart : end - blockstart]
+
+    def fetch_cached(self, chrom, start, end):
+        bounds = self.extent(chrom, start)
+        if bounds is None or end > bounds[1]:
+            return self.read(chrom, start, end)
+        lower = bounds[0]
+        first = (start - lower) // self.window_size
+        last = max(first, (end - 1 - lower) // self.window_size)
+        windows = [self.window(chrom, n, bounds) for n in range(first, last + 1)]
+        offset = lower + first * self.window_size
+        return "".join(windows)[start - offset : end - offset]
+
+    def window(self, chrom, n, bounds=(0, float("Inf"))):
+        lower, upper = bounds
+        key = (chrom, lower, n)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+            start = lower + n * self.window_size
+            sequence = self.read(chrom, start, min(start + self.window_size, upper))
+            self.cache[key] = sequence
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return sequence
+
+
+PACK_MAGIC = b"MHDBPACK"
+PACK_BASES = np.frombuffer(b"ACGT", dtype=np.uint8)
+PACK_CODES = np.zeros(256, dtype=np.uint8)
+PACK_CODES[np.frombuffer(b"ACGTacgt", dtype=np.uint8)] = [0, 1, 2, 3, 0, 1, 2, 3]
+PACK_ACGT = np.zeros(256, dtype=bool)
+PACK_ACGT[np.frombuffer(b"ACGTacgt", dtype=np.uint8)] = True
+
+
+def marker_context(markers, flank=1000):
+    """Compute the intervals within `flank` bp of each marker in a marker table"""
+    starts = markers.Start.to_numpy() - 1 - flank
+    ends = markers.End.to_numpy() + flank
+    return [
+        (chrom, max(0, int(start)), int(end))
+        for chrom, start, end in zip(markers.Chrom, starts, ends)
+    ]
+
+
+def pack_genome(reference, path, intervals=None, chunksize=2**22):
+    """Write a 2-bit packed copy of a reference genome for use with `PackedGenome`
+
+    The reference can be any object supporting `reference[chrom][start:end]` and
+    `len(reference[chrom])`, such as a `pyfaidx.Fasta` object. By default every sequence in the
+    reference is packed; if a list of `(chrom, start, end)` intervals is provided, only those
+    regions of the genome are stored.
+
+    Each base is stored in 2 bits. Like the UCSC .2bit format, runs of ambiguous bases and of
+    soft-masked (lowercase) bases are recorded separately, so that unpacked sequences are identical
+    to those in the reference except that ambiguity codes other than N are reported as N.
+    """
+    if intervals is None:
+        intervals = [(chrom, 0, len(reference[chrom])) for chrom in reference.keys()]
+    blocks = list()
+    with open(path, "wb") as fh:
+        fh.write(PACK_MAGIC)
+        for chrom, start, end in merge_intervals(intervals):
+            end = min(end, len(reference[chrom]))
+            if end <= start:
+                continue
+            block = dict(chrom=chrom, start=start, end=end, offset=fh.tell())
+            nruns, maskruns = list(), list()
+            chunksize -= chunksize % 4
+            for chunkstart in range(start, end, chunksize):
+                chunkend = min(chunkstart + chunksize, end)
+                sequence = str(reference[chrom][chunkstart:chunkend]).encode("ascii")
+                bases = np.frombuffer(sequence, dtype=np.uint8)
+                codes = PACK_CODES[bases]
+                if len(codes) % 4 > 0:
+                    codes = np.concatenate([codes, np.zeros(4 - len(codes) % 4, dtype=np.uint8)])
+                codes = codes.reshape(-1, 4)
+                packed = (codes[:, 0] << 6) | (codes[:, 1] << 4) | (codes[:, 2] << 2) | codes[:, 3]
+                fh.write(packed.astype(np.uint8).tobytes())
+                nruns.append(mask_runs(~PACK_ACGT[bases]) + (chunkstart - start))
+                maskruns.append(mask_runs(bases >= ord("a")) + (chunkstart - start))
+            for key, runs in (("nruns", nruns), ("maskruns", maskruns)):
+                runs = join_runs(np.concatenate(runs))
+                block[key] = [fh.tell(), len(runs)]
+                fh.write(runs.astype(np.int64).tobytes())
+            blocks.append(block)
+        lengths = {block["chrom"]: len(reference[block["chrom"]]) for block in blocks}
+        index = json.dumps({"blocks": blocks, "lengths": lengths}).encode("utf-8")
+        fh.write(index)
+        fh.write(np.array([len(index)], dtype=np.uint64).tobytes())
+        fh.write(PACK_MAGIC)
+
+
+def mask_runs(mask):
+    """Compute the `[start, end)` runs of true values in a boolean array
+
+    >>> mask_runs(np.array([True, True, False, False, True, False])).tolist()
+    [[0, 2], [4, 5]]
+    """
+    padded = np.concatenate([[False], mask, [False]]).astype(np.int8)
+    boundaries = np.flatnonzero(np.diff(padded))
+    return boundaries.reshape(-1, 2)
+
+
+def join_runs(runs):
+    """Merge abutting runs, such as those split across chunk boundaries"""
+    if len(runs) < 2:
+        return runs
+    keep = runs[1:, 0] != runs[:-1, 1]
+    starts = runs[np.concatenate([[True], keep]), 0]
+    ends = runs[np.concatenate([keep, [True]]), 1]
+    return np.stack([starts, ends], axis=1)
+
+
+class PackedGenome:
+    """Memory-mapped 2-bit packed reference genome written by `pack_genome`
+
+    Sequences are retrieved with the same `genome[chrom][start:end]` syntax used by `pyfaidx`.
+    Only the bytes needed for each slice are read from disk and unpacked.
+    """
+
+    def __init__(self, path):
+        self.data = np.memmap(path, dtype=np.uint8, mode="r")
+        footer = bytes(self.data[-16:])
+        if bytes(self.data[:8]) != PACK_MAGIC or footer[8:] != PACK_MAGIC:
+            raise ValueError(f'"{path}" is not a packed genome file')
+        length = int(np.frombuffer(footer[:8], dtype=np.uint64)[0])
+        index = json.loads(bytes(self.data[-16 - length : -16]).decode("utf-8"))
+        self.blocks = dict()
+        for block in index["blocks"]:
+            for key in ("nruns", "maskruns"):
+                offset, count = block[key]
+                runs = self.data[offset : offset + count * 16].view(np.int64).reshape(-1, 2)
+                block[key] = runs
+            self.blocks.setdefault(block["chrom"], list()).append(block)
+        self.starts = {
+            chrom: [block["start"] for block in blocks] for chrom, blocks in self.blocks.items()
+        }
+        self.lengths = {chrom: blocks[-1]["end"] for chrom, blocks in self.blocks.items()}
+        self.lengths.update(index.get("lengths", dict()))
+
+    def keys(self):
+        return self.blocks.keys()
+
+    def __getitem__(self, chrom):
+        if chrom not in self.blocks:
+            raise KeyError(chrom)
+        return PackedChromosome(self, chrom)
+
+    def extent(self, chrom, position):
+        """Retrieve the `(start, end)` bounds of the packed block containing `position`, if any"""
+        i = bisect_right(self.starts.get(chrom, []), position) - 1
+        if i < 0 or position >= self.blocks[chrom][i]["end"]:
+            return None
+        return self.blocks[chrom][i]["start"], self.blocks[chrom][i]["end"]
+
+    def fetch(self, chrom, start, end):
+        i = bisect_right(self.starts[chrom], start) - 1
+        if i < 0 or end > self.blocks[chrom][i]["end"]:
+            message = f"sequence {chrom}:{start}-{end} is not included in the packed genome"
+            raise MissingSequenceError(message)
+        block = self.blocks[chrom][i]
+        relstart, relend = start - block["start"], end - block["start"]
+        firstbyte, lastbyte = relstart // 4, (relend + 3) // 4
+        offset = block["offset"]
+        packed = self.data[offset + firstbyte : offset + lastbyte]
+        codes = (packed[:, np.newaxis] >> np.array([6, 4, 2, 0], dtype=np.uint8)) & 3
+        codes = codes.ravel()[relstart - firstbyte * 4 : relend - firstbyte * 4]
+        bases = PACK_BASES[codes]
+        for runstart, runend in overlapping_runs(block["nruns"], relstart, relend):
+            bases[runstart - relstart : runend - relstart] = ord("N")
+        for runstart, runend in overlapping_runs(block["maskruns"], relstart, relend):
+            bases[runstart - relstart : runend - relstart] |= 0x20
+        return bases.tobytes().decode("ascii")
+
+
+class MissingSequenceError(ValueError):
+    """Raised when a requested sequence is not stored in a `PackedGenome`"""
+
+
+def overlapping_runs(runs, start, end):
+    first = np.searchsorted(runs[:, 1], start, side="right")
+    last = np.searchsorted(runs[:, 0], end, side="left")
+    for runstart, runend in runs[first:last]:
+        yield max(runstart, start), min(runend, end)
+
+
+class PackedChromosome:
+    def __init__(self, genome, chrom):
+        self.genome = genome
+        self.chrom = chrom
+
+    def __len__(self):
+        return self.genome.lengths[self.chrom]
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice) or key.step not in (None, 1):
+            raise TypeError("packed genome sequences support only contiguous slices")
+        start, stop, step = key.indices(len(self))
+        return self.genome.fetch(self.chrom, start, max(start, stop))
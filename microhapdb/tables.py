@@ -10,17 +10,170 @@
 # Development Center.
 # -------------------------------------------------------------------------------------------------
 
+"""Lazily loaded data tables
+
+The data tables are not parsed when the package is imported. Each table is loaded the first time
+it is accessed as a module attribute (e.g. `microhapdb.tables.frequencies`) and cached for the
+remainder of the process, so that commands touching only one or two tables don't pay the cost of
+loading all of them.
+
+Each table is distributed as a CSV file and, optionally, in a compact columnar binary format
+(`.npz`) written by the database build. The binary format records the checksum of the CSV file it
+was written from, and is loaded in place of the CSV when the checksums match; it produces a table
+identical to the one parsed from CSV.
+
+The GRCh38 reference genome (`microhapdb.tables.hg38`) is loaded from a compact 2-bit packed file
+(`hg38.pack`, see `microhapdb.sequence.PackedGenome`) when present, and otherwise from the FASTA
+file installed with `microhapdb --download`. When both are present, sequences not stored in the
+packed file are extracted from the FASTA file (`microhapdb.tables.sequences`).
+"""
+
+from collections import defaultdict
+from hashlib import sha256
 from importlib.resources import files
+import numpy as np
 import pandas as pd
+from pathlib import Path
+from .ae import population_aes
+from .region import RegionIndex
+from .search import SearchIndex
+from .sequence import PackedGenome, SequenceExtractor
 from pyfaidx import Fasta as FastaIdx
+from threading import RLock
+
 
+COLUMNAR_TABLES = {
+    "marker.csv": None,
+    "marker-aes.csv": {"Ae": 3},
+    "population.csv": None,
+    "frequency.csv.gz": {"Frequency": 5},
+    "indels.csv": None,
+    "merged.csv": None,
+}
 
-def read_table(table_path):
+
+def read_table(table_path, columnar=True, categorical=()):
+    """Load a data table, storing the columns listed in `categorical` as categoricals
+
+    The columnar copy of the table is used only if it was written from the current CSV file, so
+    that a stale copy left over from an earlier build never hides changes to the CSV.
+    """
     path = files("microhapdb") / "data" / table_path
-    table = pd.read_csv(path)
+    binpath = files("microhapdb") / "data" / columnar_filename(table_path)
+    if columnar and binpath.is_file():
+        if not path.is_file() or columnar_source(binpath) == file_checksum(path):
+            return read_columnar(binpath, categorical=categorical)
+    table = pd.read_csv(path, dtype={column: "category" for column in categorical})
     return table
 
 
+def file_checksum(path):
+    return sha256(path.read_bytes()).hexdigest()
+
+
+def columnar_source(path):
+    """Retrieve the checksum of the CSV file a columnar table was written from, if recorded"""
+    with np.load(path, allow_pickle=False) as data:
+        if "source" not in data:
+            return None
+        return str(data["source"])
+
+
+def columnar_filename(table_path):
+    """Name of the binary counterpart of a CSV table
+
+    >>> columnar_filename("frequency.csv.gz")
+    'frequency.npz'
+    """
+    return table_path.split(".")[0] + ".npz"
+
+
+def write_columnar(table, path, decimals=None, source=None):
+    """Write a table in a compact columnar binary format
+
+    If the table was read from a CSV file, the file's checksum should be recorded with `source` so
+    that `read_table` can detect when the columnar copy is out of date.
+
+    String columns are stored as integer codes into a table of distinct values (encoded as a single
+    NUL-separated UTF-8 buffer), and integer columns are stored with the narrowest of int32 or
+    int64 that accommodates all values. Float columns listed in `decimals` are stored as float32
+    and rounded to the specified number of decimal places when loaded, which recovers the exact
+    values of a CSV written with the same precision.
+    """
+    decimals = dict() if decimals is None else decimals
+    kinds = list()
+    arrays = dict()
+    for n, column in enumerate(table.columns):
+        values = table[column]
+        if pd.api.types.is_integer_dtype(values.dtype):
+            kinds.append("int")
+            mask = values.isna().to_numpy()
+            data = values.fillna(0).to_numpy(dtype=np.int64)
+            arrays[f"{n}.data"] = data.astype(smallest_int_dtype(data, minimum=np.int32))
+            if mask.any():
+                arrays[f"{n}.mask"] = mask
+        elif pd.api.types.is_float_dtype(values.dtype):
+            kinds.append("float")
+            if column in decimals:
+                arrays[f"{n}.data"] = values.to_numpy(dtype=np.float32)
+                arrays[f"{n}.decimals"] = np.array(decimals[column])
+            else:
+                arrays[f"{n}.data"] = values.to_numpy(dtype=np.float64)
+        else:
+            kinds.append("str")
+            categorical = pd.Categorical(values)
+            codes = categorical.codes
+            arrays[f"{n}.data"] = codes.astype(smallest_int_dtype(codes))
+            categories = "\0".join(categorical.categories).encode("utf-8")
+            arrays[f"{n}.categories"] = np.frombuffer(categories, dtype=np.uint8)
+    arrays["columns"] = np.array(table.columns, dtype=str)
+    arrays["kinds"] = np.array(kinds, dtype=str)
+    if source is not None:
+        arrays["source"] = np.array(file_checksum(Path(source)))
+    np.savez_compressed(path, **arrays)
+
+
+def read_columnar(path, categorical=()):
+    """Read a table written by `write_columnar`
+
+    String columns listed in `categorical` are loaded directly from the stored codes as
+    categoricals, without materializing a string object for every row.
+    """
+    columns = dict()
+    with np.load(path, allow_pickle=False) as data:
+        for n, (column, kind) in enumerate(zip(data["columns"], data["kinds"])):
+            values = data[f"{n}.data"]
+            if kind == "int":
+                values = values.astype(np.int64)
+                if f"{n}.mask" in data:
+                    values = values.astype(np.float64)
+                    values[data[f"{n}.mask"]] = np.nan
+            elif kind == "float":
+                values = values.astype(np.float64)
+                if f"{n}.decimals" in data:
+                    values = values.round(int(data[f"{n}.decimals"]))
+            else:
+                categories = data[f"{n}.categories"].tobytes().decode("utf-8").split("\0")
+                if column in categorical:
+                    categories = categories if values.max(initial=-1) >= 0 else []
+                    values = pd.Categorical.from_codes(values, categories=categories)
+                else:
+                    categories = np.array(categories + [np.nan], dtype=object)
+                    values = categories.take(values)
+            columns[str(column)] = values
+    return pd.DataFrame(columns)
+
+
+def smallest_int_dtype(values, minimum=np.int8):
+    for dtype in (np.int8, np.int16, np.int32, np.int64):
+        if np.dtype(dtype).itemsize < np.dtype(minimum).itemsize:
+            continue
+        info = np.iinfo(dtype)
+        if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+            return dtype
+    return np.int64
+
+
 def compile_variant_map(markers):
     variantmap = markers[["RSIDs", "Name"]].copy()
     variantmap = variantmap.rename(columns={"RSIDs": "Variant", "Name": "Marker"})
@@ -30,16 +183,180 @@ def compile_variant_map(markers):
     return variantmap.explode("Variant")
 
 
-markers = read_table("marker.csv")
-markers["Ae"] = None
-merged = read_table("merged.csv")
-populations = read_table("population.csv")
-frequencies = read_table("frequency.csv.gz")
-frequencies["Count"] = frequencies["Count"].astype("Int16")
-indels = read_table("indels.csv")
-variantmap = compile_variant_map(markers)
-hg38file = files("microhapdb") / "data" / "hg38.fasta"
-if hg38file.is_file():
-    hg38 = FastaIdx(hg38file)
-else:  # pragma: no cover
-    hg38 = None
+def compile_marker_index(markers, variantmap, merged):
+    """Map marker identifiers to the names of all corresponding marker definitions
+
+    Keys include rsIDs, marker names, locus names, and the names of loci merged into another
+    locus. When an identifier falls into more than one of these categories, rsIDs take precedence
+    over marker and locus names, which take precedence over merged locus names.
+    """
+    by_name = defaultdict(set)
+    for name in markers.Name:
+        by_name[name].add(name)
+        by_name[name.split(".")[0]].add(name)
+    by_derivative = dict()
+    for derivative, original in zip(merged.Derivative, merged.Original):
+        by_derivative[derivative] = by_name.get(original, set())
+    by_variant = defaultdict(set)
+    for variant, name in zip(variantmap.Variant, variantmap.Marker):
+        if not pd.isna(variant):
+            by_variant[variant].add(name)
+    index = {**by_derivative, **by_name, **by_variant}
+    return {ident: tuple(sorted(names)) for ident, names in index.items()}
+
+
+def compile_population_index(populations):
+    """Map population IDs and names to the IDs of all corresponding populations"""
+    index = defaultdict(set)
+    for popid, name in zip(populations.ID, populations.Name):
+        index[popid].add(popid)
+        index[name].add(popid)
+    return {ident: tuple(sorted(popids)) for ident, popids in index.items()}
+
+
+def compile_indel_index(indels):
+    """Group indel records by marker as (VariantIndex, Refr, Alt) tuples"""
+    index = defaultdict(list)
+    for marker, varindex, refr, alt in zip(
+        indels.Marker, indels.VariantIndex, indels.Refr, indels.Alt
+    ):
+        index[marker].append((varindex, refr, alt))
+    return dict(index)
+
+
+def compile_allele_index(frequencies):
+    """Map each marker to a sorted tuple of all observed alleles (haplotypes)"""
+    alleles = frequencies[["Marker", "Allele"]].drop_duplicates()
+    index = defaultdict(set)
+    for marker, allele in zip(alleles.Marker, alleles.Allele):
+        index[marker].add(allele)
+    return {marker: tuple(sorted(alleles)) for marker, alleles in index.items()}
+
+
+def compile_ae_matrix(aes):
+    """Arrange Ae values in a table with one row per marker and one column per population"""
+    matrix = aes.pivot(index="Marker", columns="Population", values="Ae")
+    matrix.columns.name = None
+    return matrix
+
+
+def ae_values(popid="1KGP"):
+    """Retrieve the Ae values of all markers for the specified population
+
+    Precomputed Ae values are selected from the Ae matrix (`microhapdb.aes`) when available;
+    otherwise, Ae values are computed from the population's haplotype frequencies, once per
+    process.
+    """
+    matrix = __getattr__("aes")
+    if popid in matrix.columns:
+        return matrix[popid]
+    with _lock:
+        if popid not in computed_aes:
+            popaes = population_aes(__getattr__("frequencies"), popid).round(3)
+            if len(popaes) == 0:
+                raise ValueError(f'no Ae data for population "{popid}"')
+            computed_aes[popid] = popaes.set_index(popaes.Marker.astype(str)).Ae
+    return computed_aes[popid]
+
+
+def join_aes(markers, popid="1KGP"):
+    """Set the Ae column of a marker table to the values for the specified population"""
+    return markers.assign(Ae=markers.Name.map(ae_values(popid)))
+
+
+def load_markers():
+    return join_aes(read_table("marker.csv"), popid="1KGP")
+
+
+def load_frequencies():
+    categorical = ("Marker", "Population", "Allele", "Source")
+    frequencies = read_table("frequency.csv.gz", categorical=categorical)
+    frequencies["Count"] = frequencies["Count"].astype("Int16")
+    return frequencies
+
+
+def load_variantmap():
+    return compile_variant_map(__getattr__("markers"))
+
+
+def load_markerindex():
+    return compile_marker_index(
+        __getattr__("markers"), __getattr__("variantmap"), __getattr__("merged")
+    )
+
+
+def load_populationindex():
+    return compile_population_index(__getattr__("populations"))
+
+
+def load_indelindex():
+    return compile_indel_index(__getattr__("indels"))
+
+
+def load_alleleindex():
+    return compile_allele_index(__getattr__("frequencies"))
+
+
+def load_regionindex():
+    return RegionIndex(__getattr__("markers"))
+
+
+def load_searchindex():
+    terms = dict.fromkeys(__getattr__("markerindex"), "marker")
+    terms.update(dict.fromkeys(__getattr__("populationindex"), "population"))
+    return SearchIndex(terms)
+
+
+def load_hg38():
+    packfile = files("microhapdb") / "data" / "hg38.pack"
+    hg38file = files("microhapdb") / "data" / "hg38.fasta"
+    if packfile.is_file():
+        return PackedGenome(packfile)
+    elif hg38file.is_file():
+        return FastaIdx(hg38file)
+    else:  # pragma: no cover
+        return None
+
+
+def load_sequences():
+    reference = __getattr__("hg38")
+    fallback = None
+    hg38file = files("microhapdb") / "data" / "hg38.fasta"
+    if isinstance(reference, PackedGenome) and hg38file.is_file():
+        fallback = FastaIdx(hg38file)
+    return SequenceExtractor(reference, cache_size=16, fallback=fallback)
+
+
+loaders = {
+    "markers": load_markers,
+    "aes": lambda: compile_ae_matrix(read_table("marker-aes.csv")),
+    "merged": lambda: read_table("merged.csv"),
+    "populations": lambda: read_table("population.csv"),
+    "frequencies": load_frequencies,
+    "indels": lambda: read_table("indels.csv"),
+    "variantmap": load_variantmap,
+    "markerindex": load_markerindex,
+    "populationindex": load_populationindex,
+    "indelindex": load_indelindex,
+    "alleleindex": load_alleleindex,
+    "regionindex": load_regionindex,
+    "searchindex": load_searchindex,
+    "hg38": load_hg38,
+    "sequences": load_sequences,
+}
+_lock = RLock()
+computed_aes = dict()
+
+
+def __getattr__(name):
+    if name not in loaders:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _lock:
+        if name not in globals():
+            globals()[name] = loaders[name]()
+    return globals()[name]
+
+
+def loaded():
+    """List the names of the tables that have been loaded into memory so far"""
+    return sorted(name for name in loaders if name in globals())
@@ -13,9 +13,12 @@
 from importlib.resources import files
 from io import StringIO
 import microhapdb
+import os
 from microhapdb.cli import get_parser
+from microhapdb.sequence import PackedGenome, SequenceExtractor, marker_context, pack_genome
 import pandas
 import pytest
+import sys
 from tempfile import NamedTemporaryFile
 
 
@@ -282,6 +285,32 @@ def test_main_marker_region_mode_failure(capsys):
         microhapdb.cli.main(args)
 
 
+def test_main_marker_regions_file(capsys):
+    with NamedTemporaryFile() as bedfile:
+        with open(bedfile.name, "w") as fh:
+            print("track name=targets", file=fh)
+            print("chr1\t0\t50000", file=fh)
+            print("chr2\t644352\t644353", file=fh)
+            print("chr2\t644511\t644512", file=fh)
+            print("chrY\t0\t1000000", file=fh)
+        arglist = ["marker", "--regions-file", bedfile.name]
+        args = get_parser().parse_args(arglist)
+        microhapdb.cli.main(args)
+    out, err = capsys.readouterr()
+    names = [line.split()[0] for line in out.strip().split("\n")[1:]]
+    assert names == ["mh01LW-3", "mh02WL-080"]
+
+
+def test_main_marker_regions_file_bad():
+    with NamedTemporaryFile() as bedfile:
+        with open(bedfile.name, "w") as fh:
+            print("chr1\t0", file=fh)
+        arglist = ["marker", "--regions-file", bedfile.name]
+        args = get_parser().parse_args(arglist)
+        with pytest.raises(ValueError, match=r'cannot parse BED interval "chr1\s0"'):
+            microhapdb.cli.main(args)
+
+
 def test_main_marker_panel(capsys):
     with NamedTemporaryFile() as panelfile:
         with open(panelfile.name, "w") as fh:
@@ -452,6 +481,57 @@ mh09KK-033.v2        4      78  chr9 680714 680791 680714;680763;680768;680791 6
     assert observed.strip() == expected.strip()
 
 
+def test_lookup_batch(capsys):
+    arglist = ["lookup", "rs10815466", "mh17KK-014"]
+    args = get_parser().parse_args(arglist)
+    microhapdb.cli.main(args)
+    out, err = capsys.readouterr()
+    lines = out.strip().split("\n")
+    assert lines[0].split()[:2] == ["Input", "Name"]
+    assert [line.split()[:2] for line in lines[1:]] == [
+        ["rs10815466", "mh09KK-033.v1"],
+        ["rs10815466", "mh09KK-033.v2"],
+        ["mh17KK-014", "mh17KK-014"],
+    ]
+
+
+def test_lookup_batch_file(tmp_path):
+    idfile = tmp_path / "ids.txt"
+    idfile.write_text("Japanese\nFakeIdentifier EUR\n")
+    arglist = ["lookup", "--file", str(idfile), "Chagga"]
+    args = get_parser().parse_args(arglist)
+    message = r"1 identifier\(s\) not found in MicroHapDB: FakeIdentifier"
+    with pytest.warns(UserWarning, match=message):
+        result = microhapdb.cli.lookup.query(args)
+    assert result.Input.tolist() == ["Chagga", "Chagga", "Japanese", "Japanese", "EUR"]
+    assert result.ID.tolist()[2:] == ["MHDBP-63967b883e", "SA000010B", "EUR"]
+
+
+def test_lookup_batch_stdin(monkeypatch):
+    monkeypatch.setattr("sys.stdin", StringIO("Asia\nmh17KK-014\n"))
+    args = get_parser().parse_args(["lookup", "--file", "-"])
+    result = microhapdb.cli.lookup.query(args)
+    assert result.Input.tolist() == ["mh17KK-014", "Asia"]
+    assert result.Name.tolist() == ["mh17KK-014", "Asia"]
+
+
+def test_lookup_fuzzy(capsys):
+    arglist = ["lookup", "--fuzzy", "--limit", "1", "Chaga", "mh17KL-014", "Bogus"]
+    args = get_parser().parse_args(arglist)
+    with pytest.warns(UserWarning, match=r"not found in MicroHapDB: Bogus"):
+        result = microhapdb.cli.lookup.query(args)
+    assert result.Input.tolist() == ["Chaga", "Chaga", "mh17KL-014"]
+    assert result.Match.tolist() == ["Chagga", "Chagga", "mh17KK-014"]
+    assert result.Name.tolist() == ["Chagga", "Chagga", "mh17KK-014"]
+    assert result.NumVars.tolist()[2] == 3
+
+
+def test_lookup_no_ids():
+    args = get_parser().parse_args(["lookup"])
+    with pytest.raises(ValueError, match=r"no identifiers provided"):
+        microhapdb.cli.main(args)
+
+
 def test_ae_pop(capsys):
     arglist = ["marker", "--region=chr18:1-25000000", "--ae-pop=EAS"]
     args = get_parser().parse_args(arglist)
@@ -496,6 +576,16 @@ mh18SCUZJ-0064707.v2        7     317 chr18 14298131 14298447  2.146
     assert exp_out.strip() == obs_out.strip()
 
 
+def test_ae_pop_global_state_unchanged(capsys):
+    before = microhapdb.markers
+    arglist = ["marker", "--ae-pop=CEU", "--query=Ae > 10", "--region=chr18"]
+    args = get_parser().parse_args(arglist)
+    microhapdb.cli.main(args)
+    terminal = capsys.readouterr()
+    assert "mh18SCUZJ-0020879.v1" in terminal.out
+    assert microhapdb.markers is before
+
+
 def test_ae_pop_bad_pop():
     arglist = ["marker", "--ae-pop=ABC", "mh18USC-18pA"]
     args = get_parser().parse_args(arglist)
@@ -544,6 +634,69 @@ def test_marker_offsets_cli(capsys):
     assert observed == expected
 
 
+def test_objectify_loci():
+    table = microhapdb.Marker.table_from_ids(["mh01KK-205", "mh17KK-014"])
+    table = table.iloc[[0, 5, 1, 2, 3, 4]]
+    loci = list(microhapdb.cli.marker.objectify_loci(table))
+    assert [locus.name for locus in loci] == ["mh01KK-205", "mh17KK-014"]
+    observed = [marker.name for marker in loci[0].markers]
+    assert observed == [f"mh01KK-205.v{n}" for n in (1, 5, 2, 3, 4)]
+
+
+def test_write_table_chunks(capsys):
+    table = microhapdb.frequencies.head(25)
+    microhapdb.cli.output.write_table(table, chunksize=10, index=False)
+    terminal = capsys.readouterr()
+    assert terminal.out == table.to_csv(sep="\t", index=False)
+    microhapdb.cli.output.write_table(table.head(0), index=False)
+    terminal = capsys.readouterr()
+    assert terminal.out == "Marker\tPopulation\tAllele\tFrequency\tCount\tSource\n"
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 10000])
+def test_write_aligned_chunks(chunksize, capsys):
+    table = microhapdb.markers.head(25)
+    for subset in (table, table.head(0)):
+        microhapdb.cli.output.write_aligned(subset, chunksize=chunksize)
+        terminal = capsys.readouterr()
+        assert terminal.out == subset.to_string(index=False) + "\n"
+
+
+class UniformChromosome:
+    def __len__(self):
+        return 200_000_000
+
+    def __getitem__(self, key):
+        return "A" * (key.stop - key.start)
+
+
+def test_main_marker_fasta_packed_only(monkeypatch, tmp_path, capsys):
+    markers = microhapdb.Marker.table_from_ids(["mh13CP-010"])
+    path = tmp_path / "hg38.pack"
+    reference = {"chr13": UniformChromosome()}
+    pack_genome(reference, path, intervals=marker_context(markers, flank=200))
+    extractor = SequenceExtractor(PackedGenome(path))
+    monkeypatch.setattr(microhapdb.tables, "sequences", extractor, raising=False)
+    args = get_parser().parse_args(["marker", "--format=fasta", "mh13CP-010"])
+    microhapdb.cli.main(args)
+    out, err = capsys.readouterr()
+    assert out.split("\n")[1] == "A" * 80
+    args = get_parser().parse_args(["marker", "--format=fasta", "--delta=500", "mh13CP-010"])
+    with pytest.raises(SystemExit, match=r"is not included in the packed genome.+--download"):
+        microhapdb.cli.main(args)
+
+
+def test_broken_pipe(monkeypatch):
+    read, write = os.pipe()
+    os.close(read)
+    with open(write, "w") as stream:
+        monkeypatch.setattr(sys, "stdout", stream)
+        args = get_parser().parse_args(["frequency", "--marker", "mh17KK-014"])
+        with pytest.raises(SystemExit) as exception:
+            microhapdb.cli.main(args)
+    assert exception.value.code == 1
+
+
 def test_mhpl8r(capsys):
     arglist = ["frequency", "--marker", "mh02USC-2pA", "--population", "EAS", "--format", "mhpl8r"]
     args = microhapdb.cli.get_parser().parse_args(arglist)
@@ -620,6 +773,19 @@ def test_efm(capsys):
     assert result["mh17USC-17pA"].iloc[3] == pytest.approx(0.022)
 
 
+def test_efm_table_layout():
+    freqs = microhapdb.frequencies
+    freqs = freqs[freqs.Population == "SA000009J"]
+    panel = sorted(freqs.Marker.unique())[:5][::-1]
+    table = microhapdb.cli.frequency.construct_frequency_table("SA000009J", panel)
+    assert list(table.columns) == sorted(panel)
+    freqs = freqs[freqs.Marker.isin(panel)]
+    assert len(table) == len(freqs.Allele.unique())
+    assert table.notna().sum().sum() == len(freqs)
+    for marker, allele, frequency in zip(freqs.Marker, freqs.Allele, freqs.Frequency):
+        assert table.loc[allele, marker] == pytest.approx(frequency, abs=0.001)
+
+
 def test_efm_multi_pop():
     arglist = [
         "frequency",
@@ -678,6 +844,23 @@ mh01NH-04.v1        3      53  chr1 230684832 230684884 3.060          Hiroaki20
     assert observed.strip() == expected.strip()
 
 
+def test_cli_summarize_manifest(capsys, monkeypatch):
+    summary = dict(markers=3, loci=2, populations=4, haplotypes=5, frequencies=6)
+    manifest = {"summary": summary, "checksums": {"marker.csv": "0123abcd"}}
+    monkeypatch.setattr(microhapdb.cli.summarize, "read_manifest", lambda: manifest)
+    args = get_parser().parse_args(["summarize"])
+    microhapdb.cli.main(args)
+    terminal = capsys.readouterr()
+    assert "  - 3 allele definitions\n  - 2 distinct loci\n" in terminal.out
+    assert "  - 6 total microhap frequencies" in terminal.out
+    args = get_parser().parse_args(["summarize", "--recompute"])
+    message = r"database manifest does not match the data tables: summary.frequencies, .*"
+    with pytest.warns(UserWarning, match=message):
+        microhapdb.cli.main(args)
+    terminal = capsys.readouterr()
+    assert f"  - {len(microhapdb.markers)} allele definitions" in terminal.out
+
+
 def test_cli_summarize(capsys):
     args = get_parser().parse_args(["summarize"])
     microhapdb.cli.main(args)
@@ -0,0 +1,100 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+import microhapdb
+from microhapdb import Database, Marker
+import pandas as pd
+from pathlib import Path
+import pickle
+import pytest
+import random
+import subprocess
+import sys
+
+
+def test_database_immutable():
+    db = Database(ae_pop="CEU")
+    with pytest.raises(AttributeError, match=r"Database objects are immutable"):
+        db.ae_pop = "YRI"
+    with pytest.raises(AttributeError, match=r"object has no attribute 'bogus'"):
+        db.bogus
+    assert db.populations is microhapdb.populations
+    assert db.with_ae_population("YRI").ae_pop == "YRI"
+    assert db.ae_pop == "CEU"
+
+
+def test_database_default_ae_pop():
+    assert Database().markers is microhapdb.markers
+    table = Database(ae_pop="YRI").marker_table(ids=["mh17KK-014"])
+    assert table.Ae.tolist() == pytest.approx([microhapdb.aes.loc["mh17KK-014", "YRI"]])
+    assert microhapdb.markers.set_index("Name").Ae["mh17KK-014"] == pytest.approx(2.074)
+
+
+def test_database_marker_table():
+    db = Database()
+    table = db.marker_table(ids=["mh18CP-005", "mh18KK-285"], region="chr18:24000000-25000000")
+    assert table.Name.tolist() == ["mh18KK-285.v1", "mh18KK-285.v2"]
+    table = db.marker_table(regions=["chr18:1-2000000"], query="Source == 'Zhu2023'")
+    assert table.Name.tolist() == ["mh18SCUZJ-0002652", "mh18SCUZJ-0003488", "mh18SCUZJ-0009510"]
+    assert len(db.marker_table(ids=[])) == 0
+    assert len(db.marker_table()) == len(microhapdb.markers)
+
+
+def test_database_population_table():
+    db = Database()
+    assert db.population_table(ids=["Japanese"]).ID.tolist() == ["MHDBP-63967b883e", "SA000010B"]
+    table = db.population_table(query="Source == 'Hiroaki2015'")
+    assert table.ID.tolist() == ["MHDBP-63967b883e"]
+
+
+def concurrent_workload():
+    populations = ["1KGP", "CEU", "YRI", "JPT", "EAS", "HainanLi"]
+    regions = ["chr1:1-20000000", "chr7", "chr18:1-25000000", "chrX:1-60000000"]
+    workload = [(popid, region) for popid in populations for region in regions] * 10
+    random.Random(42).shuffle(workload)
+    return workload
+
+
+def run_query(popid, region):
+    table = Database(ae_pop=popid).marker_table(region=region, query="NumVars > 3")
+    markers = list(Marker.from_region(region, ae_pop=popid))
+    markers = pd.DataFrame([(marker.name, marker.data.Ae) for marker in markers])
+    return table[["Name", "Ae"]], markers
+
+
+CONCURRENT_QUERIES = """
+from concurrent.futures import ThreadPoolExecutor
+import microhapdb
+import pickle
+import sys
+sys.path.insert(0, sys.argv[1])
+from test_database import concurrent_workload, run_query
+assert microhapdb.tables.loaded() == [] and microhapdb.tables.computed_aes == dict()
+with ThreadPoolExecutor(max_workers=16) as executor:
+    results = list(executor.map(lambda query: run_query(*query), concurrent_workload()))
+sys.stdout.buffer.write(pickle.dumps(results))
+"""
+
+
+def test_database_concurrent_queries():
+    """Tables, indexes, and Ae values are first loaded by concurrent queries in a fresh process"""
+    command = [sys.executable, "-c", CONCURRENT_QUERIES, str(Path(__file__).parent)]
+    result = subprocess.run(command, capture_output=True, check=True)
+    results = pickle.loads(result.stdout)
+    workload = concurrent_workload()
+    expected = {query: run_query(*query) for query in set(workload)}
+    for query, (table, markers) in zip(workload, results):
+        expected_table, expected_markers = expected[query]
+        assert table.equals(expected_table)
+        assert markers.equals(expected_markers)
+    assert microhapdb.markers.set_index("Name").Ae["mh17KK-014"] == pytest.approx(2.074)
@@ -0,0 +1,64 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+import microhapdb
+from microhapdb.manifest import compare_manifests, compute_manifest, read_manifest, write_manifest
+import pytest
+
+
+@pytest.fixture(scope="module")
+def manifest():
+    return compute_manifest(microhapdb.markers, microhapdb.populations, microhapdb.frequencies)
+
+
+def test_manifest_summary(manifest):
+    summary = manifest["summary"]
+    assert summary["markers"] == len(microhapdb.markers)
+    assert summary["loci"] == len(
+        set(m.locus for m in microhapdb.Marker.objectify(microhapdb.markers))
+    )
+    assert summary["populations"] == len(microhapdb.populations)
+    frequencies = microhapdb.frequencies
+    assert summary["haplotypes"] == len(frequencies[["Marker", "Allele"]].drop_duplicates())
+    assert summary["frequencies"] == len(frequencies)
+
+
+def test_manifest_stats(manifest):
+    kidd = manifest["sources"]["Kidd2018"]
+    assert kidd["populations"] == 70
+    assert kidd["frequencies"] == (microhapdb.frequencies.Source == "Kidd2018").sum()
+    yu = manifest["sources"]["Yu2022G2"]
+    assert yu["markers"] == microhapdb.markers.Source.str.contains("Yu2022G2").sum()
+    assert yu["frequencies"] == 0
+    freqs = microhapdb.frequencies[microhapdb.frequencies.Population == "SA000001B"]
+    observed = manifest["populations"]["SA000001B"]
+    assert observed == {"markers": freqs.Marker.nunique(), "frequencies": len(freqs)}
+    assert "SA000001B" not in manifest["sources"]
+
+
+def test_manifest_checksums(manifest, tmp_path):
+    assert set(manifest["checksums"]) >= {"marker.csv", "population.csv", "merged.csv"}
+    (tmp_path / "marker.csv").write_text("Name\n")
+    checksums = compute_manifest(
+        microhapdb.markers, microhapdb.populations, microhapdb.frequencies, directory=tmp_path
+    )["checksums"]
+    assert list(checksums) == ["marker.csv"]
+    assert checksums["marker.csv"] != manifest["checksums"]["marker.csv"]
+
+
+def test_manifest_roundtrip(manifest, tmp_path):
+    path = tmp_path / "manifest.json"
+    write_manifest(manifest, path)
+    assert read_manifest(path) == manifest
+    assert compare_manifests(manifest, read_manifest(path)) == []
+    assert read_manifest(tmp_path / "bogus.json") is None
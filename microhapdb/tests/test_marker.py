@@ -14,6 +14,8 @@
 from collections import defaultdict
 import microhapdb
 from microhapdb import Marker, Locus
+from microhapdb.marker import MarkerRecord
+import pandas as pd
 import pytest
 
 
@@ -34,6 +36,37 @@ def test_standardize_ids():
     ]
 
 
+def legacy_standardize_ids(idents):
+    """Reference implementation of identifier resolution based on full table scans"""
+    ids = set()
+    for ident in idents:
+        locusnames = microhapdb.markers.Name.apply(lambda x: x.split(".")[0])
+        if ident in microhapdb.variantmap.Variant.values:
+            result = microhapdb.variantmap[microhapdb.variantmap.Variant == ident]
+            ids.update(result.Marker)
+        elif ident in microhapdb.markers.Name.values or ident in locusnames.values:
+            result = microhapdb.markers[microhapdb.markers.Name.str.contains(ident)]
+            ids.update(result.Name)
+        elif ident in microhapdb.merged.Derivative.values:
+            result = microhapdb.merged[microhapdb.merged.Derivative.str.contains(ident)]
+            original = result.Original.iloc[0]
+            result = microhapdb.markers[microhapdb.markers.Name.str.contains(original)]
+            ids.update(result.Name)
+    return sorted(microhapdb.markers[microhapdb.markers.Name.isin(ids)].Name)
+
+
+def test_standardize_ids_matches_legacy():
+    markers = microhapdb.markers.sample(n=100, random_state=42)
+    idents = list(markers.Name) + [name.split(".")[0] for name in markers.Name]
+    variants = microhapdb.variantmap.Variant.dropna()
+    idents += list(variants.sample(n=100, random_state=42))
+    idents += list(microhapdb.merged.Derivative.sample(n=50, random_state=42))
+    idents += ["FakeIdentifier", "rs0", "mh01", ""]
+    for ident in idents:
+        assert Marker.standardize_ids([ident]) == legacy_standardize_ids([ident]), ident
+    assert Marker.standardize_ids(idents) == legacy_standardize_ids(idents)
+
+
 def test_assumptions():
     total_markers_per_source = [
         11,  # Chen2019
@@ -913,6 +946,26 @@ def test_from_region():
     assert observed == expected
 
 
+def test_from_regions():
+    regions = ["chrX", "chr12:100000000-200000000", "chr12:150000000-250000000", "chrY"]
+    expected = pd.concat([Marker.table_from_region(region) for region in regions])
+    expected = expected[~expected.index.duplicated()].sort_index()
+    observed = Marker.table_from_regions(regions)
+    assert observed.equals(expected)
+    assert len(observed) == 11 + 42
+    markers = list(Marker.from_regions([("chr12", 100000000, 200000000), ("chrY", 1, 1000)]))
+    assert len(markers) == 42
+    assert len(Marker.table_from_regions([])) == 0
+
+
+def test_from_ids_ae_pop():
+    markers = list(Marker.from_ids(["mh17KK-014", "mh18CP-005"], ae_pop="CEU"))
+    assert [marker.data.Ae for marker in markers] == [1.842, 3.49]
+    marker = Marker.from_id("mh17KK-014", ae_pop="YRI")
+    assert marker.data.Ae == pytest.approx(microhapdb.aes.loc["mh17KK-014", "YRI"])
+    assert microhapdb.markers.set_index("Name").Ae["mh17KK-014"] == pytest.approx(2.074)
+
+
 def test_from_id_no_such_marker():
     with pytest.raises(ValueError, match=r"no such marker 'BoGUSid'"):
         Marker.from_id("BoGUSid")
@@ -1017,3 +1070,52 @@ def test_mh06WL017v1():
         "rs281863362",
         "rs9274227",
     ]
+
+
+@pytest.mark.parametrize(
+    "name,varlengths,reflengths",
+    [
+        ("mh01KK-117.v1", [1, 1, 1, 1], [1, 1, 1, 1]),
+        ("mh03ZBF-001", [11, 2], [11, 2]),
+        ("mh06PK-24844", [1, 2, 2, 1, 1, 1, 1, 1, 1, 1], [1] * 10),
+    ],
+)
+def test_indel_lengths(name, varlengths, reflengths):
+    marker = Marker.from_id(name)
+    assert marker.variant_lengths == varlengths
+    assert marker.reference_lengths == reflengths
+    assert marker.variant_lengths is marker.variant_lengths
+
+
+def test_marker_record():
+    table = Marker.table_from_ids(["mh17KK-014", "mh06WL-017.v1"])
+    records = list(MarkerRecord.from_table(table))
+    assert [record.Name for record in records] == ["mh06WL-017.v1", "mh17KK-014"]
+    assert records[1] == MarkerRecord.from_row(table.iloc[1])
+    assert records[1].Offsets37 == (4400355, 4400383, 4400391)
+    assert records[0].RSIDs.startswith("rs71542446;")
+    marker = Marker(table.iloc[1], delta=0, minlen=0)
+    assert marker.data == records[1]
+    assert marker.offsets == [4497060, 4497088, 4497096]
+    assert marker.target_interval == (4497060, 4497097)
+    assert Marker.from_id("mh17KK-014").data == records[1]
+
+
+def test_marker_record_without_ae():
+    table = Marker.table_from_ids(["mh17KK-014"]).drop(columns=["Ae"])
+    marker = Marker(table.iloc[0])
+    assert marker.data.Ae is None
+    assert marker.data["Chrom"] == "chr17"
+    assert marker.data["Start"] == table.Start.iloc[0]
+    assert marker.offsets == [4497060, 4497088, 4497096]
+    record = next(MarkerRecord.from_table(table))
+    assert record == marker.data
+    with pytest.raises(KeyError):
+        record["Bogus"]
+
+
+def test_marker_from_id_ae_pop():
+    assert Marker.from_id("mh17KK-014").data.Ae == pytest.approx(2.074)
+    assert Marker.from_id("mh17KK-014", ae_pop="CEU").data.Ae == pytest.approx(1.842)
+    with pytest.raises(ValueError, match=r"no such marker 'FakeMarker'"):
+        Marker.from_id("FakeMarker")
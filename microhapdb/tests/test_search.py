@@ -0,0 +1,90 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+import microhapdb
+from microhapdb.search import SearchIndex
+import pytest
+
+
+@pytest.fixture
+def index():
+    terms = [
+        "Japanese",
+        "Japanese in Tokyo, Japan",
+        "JPT",
+        "mh17KK-014",
+        "mh17KK-014.v1",
+        "rs333113",
+    ]
+    kinds = ["population"] * 3 + ["marker"] * 3
+    return SearchIndex(dict(zip(terms, kinds)))
+
+
+def test_prefix(index):
+    assert [index.terms[n] for n in index.prefix("JAPAN")] == [
+        "Japanese",
+        "Japanese in Tokyo, Japan",
+    ]
+    assert len(index.prefix("mh18")) == 0
+    assert index.suggest("mh17", limit=1) == ["mh17KK-014"]
+    assert index.suggest("bogus") == []
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("", 6),
+        ("j", 3),
+        ("14", 2),
+        ("kk-014", 2),
+        ("tokyo", 1),
+        ("333113", 1),
+        ("kk-015", 0),
+        ("zzz", 0),
+    ],
+)
+def test_substring(index, text, expected):
+    hits = index.substring(text)
+    assert len(hits) == expected
+    assert all(text in index.keys[n] for n in hits)
+
+
+def test_search_ranking(index):
+    result = index.search("japan")
+    assert result.Term.tolist() == ["Japanese", "Japanese in Tokyo, Japan"]
+    assert result.Match.tolist() == ["prefix", "prefix"]
+    result = index.search("MH17KK-014")
+    assert result.Term.tolist() == ["mh17KK-014", "mh17KK-014.v1"]
+    assert result.Match.tolist() == ["exact", "prefix"]
+    assert result.Similarity.iloc[0] == 1.0
+    assert index.search("KK-014", limit=1).Term.tolist() == ["mh17KK-014"]
+
+
+def test_search_fuzzy(index):
+    assert len(index.search("mh17KL-014")) == 0
+    result = index.search("mh17KL-014", fuzzy=True)
+    assert result.Term.tolist() == ["mh17KK-014", "mh17KK-014.v1"]
+    assert result.Match.tolist() == ["similar", "similar"]
+    assert len(index.search("mh17KL-014", fuzzy=True, threshold=0.9)) == 0
+
+
+def test_search_index_terms():
+    index = microhapdb.searchindex
+    assert len(index) == len(microhapdb.markerindex) + len(microhapdb.populationindex)
+    result = index.search("rs8074965")
+    assert result.Term.tolist() == ["rs8074965"]
+    assert result.Type.tolist() == ["marker"]
+    result = index.search("Chagga")
+    assert result.Term.tolist() == ["Chagga", "mMHseq-Chagga"]
+    assert result.Match.tolist() == ["exact", "substring"]
+    assert result.Type.tolist() == ["population", "population"]
@@ -0,0 +1,176 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+from microhapdb.sequence import PackedGenome, SequenceExtractor, marker_context, pack_genome
+import pandas as pd
+import pytest
+from pyfaidx import Fasta
+import random
+
+
+@pytest.fixture
+def reference(tmp_path):
+    rng = random.Random(42)
+    path = tmp_path / "refr.fasta"
+    with open(path, "w") as fh:
+        for chrom in ("chr1", "chr2"):
+            sequence = "".join(rng.choice("ACGT") for _ in range(50000))
+            sequence = (
+                sequence[:1000] + "N" * 500 + sequence[1500:3000] + "n" * 7 + sequence[3007:]
+            )
+            sequence = sequence[:20000] + sequence[20000:21003].lower() + sequence[21003:]
+            print(f">{chrom}", file=fh)
+            for i in range(0, len(sequence), 80):
+                print(sequence[i : i + 80], file=fh)
+    return Fasta(str(path))
+
+
+def random_intervals(n, seed=0):
+    rng = random.Random(seed)
+    intervals = list()
+    for _ in range(n):
+        chrom = rng.choice(("chr1", "chr2"))
+        start = rng.randrange(0, 49000)
+        intervals.append((chrom, start, start + rng.randrange(1, 1000)))
+    return intervals
+
+
+def test_fetch(reference):
+    extractor = SequenceExtractor(reference)
+    for chrom, start, end in random_intervals(50):
+        assert extractor.fetch(chrom, start, end) == str(reference[chrom][start:end])
+
+
+def test_fetch_many(reference):
+    intervals = random_intervals(200, seed=1)
+    extractor = SequenceExtractor(reference, merge_distance=500)
+    observed = extractor.fetch_many(intervals)
+    expected = [str(reference[chrom][start:end]) for chrom, start, end in intervals]
+    assert observed == expected
+    assert extractor.num_reads < len(intervals)
+    assert extractor.blocks == dict()
+
+
+def test_prefetched_coalesced(reference):
+    intervals = [
+        ("chr2", 2000, 2100),
+        ("chr1", 100, 200),
+        ("chr1", 250, 300),
+        ("chr1", 5000, 5100),
+    ]
+    extractor = SequenceExtractor(reference, merge_distance=100)
+    with extractor.prefetched(intervals):
+        assert extractor.num_reads == 3
+        for chrom, start, end in intervals:
+            assert extractor.fetch(chrom, start, end) == str(reference[chrom][start:end])
+        assert extractor.num_reads == 3
+        assert extractor.fetch("chr1", 1000, 1100) == str(reference["chr1"][1000:1100])
+        assert extractor.num_reads == 4
+
+
+def test_fetch_cached(reference):
+    extractor = SequenceExtractor(reference, cache_size=2, window_size=1000)
+    assert extractor.fetch("chr1", 900, 1100) == str(reference["chr1"][900:1100])
+    assert extractor.num_reads == 2
+    assert extractor.fetch("chr1", 950, 1050) == str(reference["chr1"][950:1050])
+    assert extractor.num_reads == 2
+    assert extractor.fetch("chr2", 10, 20) == str(reference["chr2"][10:20])
+    assert extractor.num_reads == 3
+    assert list(extractor.cache) == [("chr1", 0, 1), ("chr2", 0, 0)]
+    assert extractor.fetch("chr1", 49990, 50000) == str(reference["chr1"][49990:50000])
+
+
+def test_no_reference():
+    extractor = SequenceExtractor(None)
+    with pytest.raises(FileNotFoundError, match=r"GRCh38 reference genome not found"):
+        extractor.fetch("chr1", 0, 10)
+
+
+@pytest.mark.parametrize("chunksize", [2**22, 100])
+def test_packed_genome(reference, tmp_path, chunksize):
+    path = tmp_path / "refr.pack"
+    pack_genome(reference, path, chunksize=chunksize)
+    genome = PackedGenome(path)
+    assert sorted(genome.keys()) == ["chr1", "chr2"]
+    intervals = random_intervals(200, seed=2) + [("chr1", 990, 3100), ("chr2", 19999, 21010)]
+    for chrom, start, end in intervals:
+        assert genome[chrom][start:end] == str(reference[chrom][start:end])
+    assert genome["chr2"][:50000] == str(reference["chr2"][:50000])
+    assert genome["chr2"][49990:] == str(reference["chr2"][49990:])
+    assert genome["chr1"][-10:] == str(reference["chr1"][-10:])
+    assert len(genome["chr1"]) == 50000
+
+
+def test_packed_genome_context(reference, tmp_path):
+    markers = pd.DataFrame(
+        {
+            "Chrom": ["chr1", "chr1", "chr2"],
+            "Start": [1001, 1400, 30001],
+            "End": [1200, 1600, 30100],
+        }
+    )
+    intervals = marker_context(markers, flank=100)
+    assert intervals == [("chr1", 900, 1300), ("chr1", 1299, 1700), ("chr2", 29900, 30200)]
+    path = tmp_path / "refr.pack"
+    pack_genome(reference, path, intervals=intervals)
+    genome = PackedGenome(path)
+    assert genome["chr1"][900:1700] == str(reference["chr1"][900:1700])
+    assert genome["chr2"][30000:30100] == str(reference["chr2"][30000:30100])
+    with pytest.raises(ValueError, match=r"chr2:30100-30300 is not included"):
+        genome["chr2"][30100:30300]
+    with pytest.raises(ValueError, match=r"chr1:0-10 is not included"):
+        genome["chr1"][0:10]
+    extractor = SequenceExtractor(genome)
+    assert extractor.fetch_many(intervals) == [str(reference[c][s:e]) for c, s, e in intervals]
+
+
+def test_packed_genome_context_cached(reference, tmp_path):
+    intervals = [("chr1", 900, 1300), ("chr1", 1400, 1700), ("chr1", 40000, 40500)]
+    path = tmp_path / "refr.pack"
+    pack_genome(reference, path, intervals=intervals)
+    genome = PackedGenome(path)
+    assert genome.extent("chr1", 1000) == (900, 1300)
+    assert genome.extent("chr1", 1350) is None
+    assert genome.extent("chr2", 1000) is None
+    extractor = SequenceExtractor(genome, merge_distance=1000, cache_size=4, window_size=256)
+    for chrom, start, end in intervals + [("chr1", 1100, 1250), ("chr1", 40100, 40500)]:
+        assert extractor.fetch(chrom, start, end) == str(reference[chrom][start:end])
+    assert len(extractor.cache) == 4
+    with pytest.raises(ValueError, match=r"chr1:1250-1450 is not included"):
+        extractor.fetch("chr1", 1250, 1450)
+    with extractor.prefetched(intervals):
+        assert extractor.num_reads == 12
+        for chrom, start, end in intervals:
+            assert extractor.fetch(chrom, start, end) == str(reference[chrom][start:end])
+        assert extractor.num_reads == 12
+
+
+@pytest.mark.parametrize("cache_size", [0, 4])
+def test_packed_genome_fallback(reference, tmp_path, cache_size):
+    path = tmp_path / "refr.pack"
+    pack_genome(reference, path, intervals=[("chr1", 900, 1300), ("chr2", 100, 200)])
+    genome = PackedGenome(path)
+    extractor = SequenceExtractor(
+        genome, cache_size=cache_size, window_size=256, fallback=reference
+    )
+    intervals = [("chr1", 1000, 1200), ("chr1", 1250, 1450), ("chr1", 5000, 5100), ("chr2", 0, 50)]
+    for chrom, start, end in intervals:
+        assert extractor.fetch(chrom, start, end) == str(reference[chrom][start:end])
+    assert extractor.fetch_many(intervals) == [str(reference[c][s:e]) for c, s, e in intervals]
+
+
+def test_packed_genome_bad_file(tmp_path):
+    path = tmp_path / "bogus.pack"
+    path.write_bytes(b"This is not a packed genome file.")
+    with pytest.raises(ValueError, match=r"is not a packed genome file"):
+        PackedGenome(path)
@@ -0,0 +1,156 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import microhapdb
+from microhapdb.cli import get_parser
+from microhapdb.cli.serve import make_server
+import pytest
+import socket
+import sys
+from threading import Thread
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    server = make_server(port=0, preload=False)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://{}:{}".format(*server.server_address)
+    server.shutdown()
+    server.server_close()
+
+
+def get(url):
+    with urlopen(url) as response:
+        return response.read().decode(), response.headers["Content-Type"]
+
+
+def cli_output(arglist, capsys):
+    capsys.readouterr()
+    microhapdb.cli.main(get_parser().parse_args(arglist))
+    return capsys.readouterr().out
+
+
+def test_serve_text(server, capsys):
+    expected = cli_output(["marker", "--region=chr18:1-5000000", "--ae-pop=CEU"], capsys)
+    body, content_type = get(f"{server}/marker?region=chr18:1-5000000&ae-pop=CEU")
+    assert body == expected
+    assert content_type.startswith("text/plain")
+    expected = cli_output(["lookup", "rs10815466"], capsys)
+    assert get(f"{server}/lookup?id=rs10815466")[0] == expected
+
+
+def test_serve_fuzzy_lookup(server):
+    body = get(f"{server}/lookup?id=japanse&fuzzy&limit=1&output=json")[0]
+    records = json.loads(body)
+    assert [record["ID"] for record in records] == ["MHDBP-63967b883e", "SA000010B"]
+    assert records[0]["Match"] == "Japanese"
+
+
+def test_serve_json(server):
+    body, content_type = get(f"{server}/marker?id=mh17KK-014&id=mh18CP-005&output=json")
+    assert content_type == "application/json"
+    records = json.loads(body)
+    assert [record["Name"] for record in records] == ["mh17KK-014", "mh18CP-005"]
+    assert records[0]["Ae"] == pytest.approx(2.074)
+
+
+def test_serve_tsv(server):
+    url = f"{server}/frequency?marker=mh17KK-014&population=SA000001B&allele=C:C:C&output=tsv"
+    body, content_type = get(url)
+    assert content_type.startswith("text/tab-separated-values")
+    assert body.strip().split("\n") == [
+        "Marker\tPopulation\tAllele\tFrequency\tCount\tSource",
+        "mh17KK-014\tSA000001B\tC:C:C\t0.99\t94\tKidd2018",
+    ]
+
+
+@pytest.mark.parametrize(
+    "path,status,message",
+    [
+        ("/bogus", 404, 'unsupported request "bogus"'),
+        ("/marker?bogus=1", 400, 'invalid arguments for "marker" request'),
+        ("/lookup?id=FakeIdentifier", 400, 'identifier "FakeIdentifier" not found'),
+        ("/population?output=xml", 400, 'unsupported output format "xml"'),
+        ("/marker?query=Bogus%20%3E%205", 400, "name 'Bogus' is not defined"),
+        ("/population?query=ID%20%3D%3D", 400, "invalid syntax"),
+        ("/lookup?file=-", 400, 'reading files with "file" is not supported by the server'),
+        ("/marker?panel=/etc/passwd", 400, 'reading files with "panel" is not supported'),
+        ("/frequency?pan=/etc/passwd", 400, 'reading files with "panel" is not supported'),
+        ("/marker?regions-file=/etc/passwd", 400, 'reading files with "regions-file"'),
+    ],
+)
+def test_serve_errors(server, path, status, message):
+    with pytest.raises(HTTPError) as error:
+        urlopen(f"{server}{path}")
+    assert error.value.code == status
+    assert message in error.value.read().decode()
+
+
+def test_serve_internal_error(server, monkeypatch):
+    def resolve(args):
+        raise FileNotFoundError("GRCh38 reference genome not found")
+
+    monkeypatch.setattr(microhapdb.cli.lookup, "resolve", resolve)
+    with pytest.raises(HTTPError) as error:
+        urlopen(f"{server}/lookup?id=mh17KK-014")
+    assert error.value.code == 500
+    message = "FileNotFoundError: GRCh38 reference genome not found"
+    assert message in error.value.read().decode()
+
+
+@pytest.mark.parametrize("output", ["text", "json"])
+def test_serve_lookup_not_found(server, output):
+    with urlopen(f"{server}/lookup?id=mh17KK-014&id=FakeIdentifier&id=Bogus&output={output}") as r:
+        assert r.headers["X-MicroHapDB-Not-Found"] == "FakeIdentifier,Bogus"
+        assert "mh17KK-014" in r.read().decode()
+    with urlopen(f"{server}/lookup?id=mh17KK-014&id=JPT") as response:
+        assert response.headers["X-MicroHapDB-Not-Found"] is None
+
+
+def test_serve_concurrent(server):
+    populations = ["1KGP", "CEU", "YRI", "JPT", "EAS"]
+    urls = [f"{server}/marker?region=chr18&ae-pop={pop}&output=json" for pop in populations]
+    expected = {url: json.loads(get(url)[0]) for url in urls}
+    workload = urls * 10
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        results = list(executor.map(lambda url: json.loads(get(url)[0]), workload))
+    for url, records in zip(workload, results):
+        assert records == expected[url]
+    assert expected[urls[0]] != expected[urls[1]]
+
+
+def test_serve_unix_socket(monkeypatch, tmp_path):
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    path = str(tmp_path / "microhapdb.sock")
+    server = make_server(socket_path=path, preload=False)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(path)
+            client.sendall(b"GET /population?id=JPT HTTP/1.0\r\n\r\n")
+            response = b""
+            while chunk := client.recv(4096):
+                response += chunk
+    finally:
+        server.shutdown()
+        server.server_close()
+    response = response.decode()
+    assert response.startswith("HTTP/1.1 200 OK")
+    assert "JPT Japanese in Tokyo, Japan Byrska-Bishop2022" in response
@@ -0,0 +1,148 @@
+# -------------------------------------------------------------------------------------------------
+# Copyright (c) 2025, DHS.
+#
+# This file is part of MicroHapDB (http://github.com/bioforensics/MicroHapDB) and is licensed under
+# the BSD license: see LICENSE.txt.
+#
+# This software was prepared for the Department of Homeland Security (DHS) by the Battelle National
+# Biodefense Institute, LLC (BNBI) as part of contract HSHQDC-15-C-00064 to manage and operate the
+# National Biodefense Analysis and Countermeasures Center (NBACC), a Federally Funded Research and
+# Development Center.
+# -------------------------------------------------------------------------------------------------
+
+
+import microhapdb
+from microhapdb.sequence import PackedGenome, pack_genome
+import pandas
+from pyfaidx import Fasta
+import pytest
+import subprocess
+import sys
+
+
+def test_import_is_lazy():
+    code = "import microhapdb; print(','.join(microhapdb.tables.loaded()))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, check=True)
+    assert result.stdout.decode().strip() == ""
+
+
+def test_tables_cached():
+    assert microhapdb.frequencies is microhapdb.tables.frequencies
+    assert microhapdb.tables.frequencies is microhapdb.tables.frequencies
+    assert "frequencies" in microhapdb.tables.loaded()
+
+
+def test_default_ae_population():
+    assert "Ae" in microhapdb.tables.markers.columns
+    assert microhapdb.tables.markers.Ae.notna().any()
+
+
+def test_frequencies_categorical():
+    freqs = microhapdb.frequencies
+    for column in ("Marker", "Population", "Allele", "Source"):
+        assert isinstance(freqs[column].dtype, pandas.CategoricalDtype)
+    compact = freqs.memory_usage(deep=True).sum()
+    strings = freqs.astype({"Marker": str, "Allele": str}).memory_usage(deep=True).sum()
+    assert compact < strings
+
+
+def test_unknown_table():
+    with pytest.raises(AttributeError, match=r"has no attribute 'bogus'"):
+        microhapdb.tables.bogus
+    with pytest.raises(AttributeError, match=r"has no attribute 'bogus'"):
+        microhapdb.bogus
+
+
+@pytest.mark.parametrize("filename,decimals", microhapdb.tables.COLUMNAR_TABLES.items())
+def test_columnar_roundtrip(filename, decimals, tmp_path):
+    table = microhapdb.tables.read_table(filename, columnar=False)
+    path = tmp_path / microhapdb.tables.columnar_filename(filename)
+    microhapdb.tables.write_columnar(table, path, decimals=decimals)
+    observed = microhapdb.tables.read_columnar(path)
+    pandas.testing.assert_frame_equal(observed, table, check_exact=True)
+
+
+def test_columnar_stale(monkeypatch, tmp_path):
+    monkeypatch.setattr(microhapdb.tables, "files", lambda package: tmp_path)
+    (tmp_path / "data").mkdir()
+    csv = tmp_path / "data" / "test.csv"
+    csv.write_text("Name,Value\nA,1\nB,2\n")
+    microhapdb.tables.write_columnar(
+        pandas.read_csv(csv), tmp_path / "data" / "test.npz", source=csv
+    )
+    csv.write_text("Name,Value\nA,1\nB,2\nC,3\n")
+    assert microhapdb.tables.read_table("test.csv").Name.tolist() == ["A", "B", "C"]
+    microhapdb.tables.write_columnar(
+        pandas.read_csv(csv), tmp_path / "data" / "test.npz", source=csv
+    )
+    assert microhapdb.tables.columnar_source(tmp_path / "data" / "test.npz") is not None
+    csv.unlink()
+    assert microhapdb.tables.read_table("test.csv").Name.tolist() == ["A", "B", "C"]
+
+
+def test_sequences_pack_and_fasta(monkeypatch, tmp_path):
+    monkeypatch.setattr(microhapdb.tables, "files", lambda package: tmp_path)
+    (tmp_path / "data").mkdir()
+    fasta = tmp_path / "data" / "hg38.fasta"
+    fasta.write_text(">chr1\n" + "ACGTTGCA" * 500 + "\n")
+    reference = Fasta(str(fasta))
+    pack_genome(reference, tmp_path / "data" / "hg38.pack", intervals=[("chr1", 1000, 1200)])
+    monkeypatch.setattr(microhapdb.tables, "hg38", microhapdb.tables.load_hg38(), raising=False)
+    assert isinstance(microhapdb.tables.hg38, PackedGenome)
+    sequences = microhapdb.tables.load_sequences()
+    for start, end in ((1050, 1100), (1150, 1250), (2000, 2500)):
+        assert sequences.fetch("chr1", start, end) == str(reference["chr1"][start:end])
+
+
+def test_columnar_categorical(tmp_path):
+    categorical = ("Marker", "Population", "Allele", "Source")
+    table = microhapdb.tables.read_table(
+        "frequency.csv.gz", columnar=False, categorical=categorical
+    )
+    path = tmp_path / "frequency.npz"
+    microhapdb.tables.write_columnar(table, path, decimals={"Frequency": 5})
+    observed = microhapdb.tables.read_columnar(path, categorical=categorical)
+    pandas.testing.assert_frame_equal(observed, table, check_exact=True)
+
+
+def test_columnar_missing_values(tmp_path):
+    table = pandas.DataFrame(
+        {
+            "Name": ["a", None, "c", "a"],
+            "Count": pandas.array([3, None, 70000, 1], dtype="Int64"),
+            "Value": [0.25, float("nan"), 1.5, 0.125],
+        }
+    )
+    path = tmp_path / "test.npz"
+    microhapdb.tables.write_columnar(table, path)
+    observed = microhapdb.tables.read_columnar(path)
+    assert observed.Name.isna().tolist() == [False, True, False, False]
+    assert observed.Name[0] == observed.Name[3] == "a"
+    assert observed.Count.isna().tolist() == [False, True, False, False]
+    assert observed.Count[2] == 70000
+    assert observed.Value.tolist()[2:] == [1.5, 0.125]
+
+
+def test_ae_matrix():
+    aes = microhapdb.aes
+    assert aes.shape == (3053, 31)
+    assert aes.loc["mh17KK-014", "1KGP"] == pytest.approx(2.074)
+    assert microhapdb.tables.ae_values("CEU").equals(aes["CEU"])
+
+
+def test_ae_values_on_demand():
+    assert "HainanLi" not in microhapdb.aes.columns
+    aes = microhapdb.tables.ae_values("HainanLi")
+    assert microhapdb.tables.ae_values("HainanLi") is aes
+    freqs = microhapdb.frequencies
+    freqs = freqs[(freqs.Population == "HainanLi") & (freqs.Marker == aes.index[0])]
+    assert aes.iloc[0] == pytest.approx(1 / (freqs.Frequency**2).sum(), abs=0.001)
+    with pytest.raises(ValueError, match=r'no Ae data for population "Bogus"'):
+        microhapdb.tables.ae_values("Bogus")
+
+
+def test_population_index():
+    index = microhapdb.populationindex
+    assert index["Japanese"] == ("MHDBP-63967b883e", "SA000010B")
+    assert index["SA000010B"] == ("SA000010B",)
+    assert "Bogus" not in index